@@ -43,6 +43,49 @@ class Bank:
         self.bank_to_loan = self.deposits - (self.reserves + self.bank_loans)
 
 
+class CellOccupancy:
+    """Index of the people standing on each cell of the grid.
+
+    Like the Bank, this is not a Mesa Agent. It keeps a list of occupants for
+    every cell together with the position of each person in that list, so that
+    moving a person and drawing a random trade partner from the same cell are
+    both constant time, no matter how crowded the cell is.
+    """
+
+    def __init__(self):
+        # cell -> list of people on that cell
+        self.occupants = {}
+        # person -> index of that person in the list of its cell
+        self.slots = {}
+
+    def add(self, person, cell):
+        occupants = self.occupants.setdefault(cell, [])
+        self.slots[person] = len(occupants)
+        occupants.append(person)
+
+    def remove(self, person, cell):
+        occupants = self.occupants[cell]
+        slot = self.slots.pop(person)
+        # move the last occupant into the freed slot to keep the list compact
+        last = occupants.pop()
+        if last is not person:
+            occupants[slot] = last
+            self.slots[last] = slot
+
+    def count(self, cell):
+        """Return the number of people on a cell."""
+        return len(self.occupants.get(cell, ()))
+
+    def random_other(self, person, random):
+        """Return a random person on the same cell as person, other than person."""
+        occupants = self.occupants[person.cell]
+        # draw from all slots but one, and skip over the slot of person itself
+        slot = random.randrange(len(occupants) - 1)
+        if slot >= self.slots[person]:
+            slot += 1
+        return occupants[slot]
+
+
 # subclass of RandomWalker, which is subclass to Mesa Agent
 class Person(CellAgent):
     def __init__(self, model, moore, bank, rich_threshold):
@@ -62,18 +105,24 @@ class Person(CellAgent):
         # person's bank, set at __init__, all people have the same bank in this model
         self.bank = bank
 
+    @CellAgent.cell.setter
+    def cell(self, cell):
+        # keep the model's occupancy index in sync with the grid
+        if self.cell is not None:
+            self.model.occupancy.remove(self, self.cell)
+        CellAgent.cell.fset(self, cell)
+        if cell is not None:
+            self.model.occupancy.add(self, cell)
+
     def do_business(self):
         """Check if person has any savings, any money in wallet, or if the
         bank can loan them any money
         """
-        if (self.savings > 0 or self.wallet > 0 or self.bank.bank_to_loan > 0) and len(
-            self.cell.agents
-        ) > 1:
-            # create list of people at my location (includes self)
-            # set customer to self for while loop condition
-            customer = self
-            while customer == self:
-                customer = self.random.choice(self.cell.agents)
+        if (
+            self.savings > 0 or self.wallet > 0 or self.bank.bank_to_loan > 0
+        ) and self.model.occupancy.count(self.cell) > 1:
+            # select a random other person at my location to trade with
+            customer = self.model.occupancy.random_other(self, self.random)
             # 50% chance of trading with customer
             if self.random.randint(0, 1) == 0:
                 # 50% chance of trading $5
@@ -8,26 +8,184 @@ Author of NetLogo code:
     Center for Connected Learning and Computer-Based Modeling,
     Northwestern University, Evanston, IL.
 
-This version of the model has a BatchRunner at the bottom. This
+This version of the model has a batch runner at the bottom. This
 is for collecting data on parameter sweeps. It is not meant to
 be run with run.py, since run.py starts up a server for visualization, which
-isn't necessary for the BatchRunner. To run a parameter sweep, call
+isn't necessary for the batch runner. To run a parameter sweep, call
 batch_run.py in the command line.
 
-The BatchRunner is set up to collect step by step data of the model. It does
-this by collecting the DataCollector object in a model_reporter (i.e. the
-DataCollector is collecting itself every step).
+The batch runner is set up to collect step by step data of the model. Each
+parameter combination and iteration is run in its own worker process, and as
+soon as a run finishes its data is written to disk as a single Parquet file.
+Nothing is kept in memory across runs, so sweeps are only limited by disk space.
 
-The end result of the batch run will be a CSV file created in the same
-directory from which Python was run. The CSV file will contain the data from
-every step of every run.
+The end result of the batch run will be a Parquet dataset in the directory
+"BankReservesModel_Data", partitioned by parameter values:
+
+    BankReservesModel_Data/init_people=25/rich_threshold=5/reserve_percent=5/iteration=0.parquet
+
+The dataset can be loaded (or filtered) in one go with
+``pd.read_parquet("BankReservesModel_Data", columns=[...])``, or summarized
+batch by batch with ``summarize``, which never holds more than one batch of the
+dataset in memory. If a sweep is interrupted, running it again only executes
+the runs whose file does not exist yet.
 """
 
-import mesa
+import itertools
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
 import pandas as pd
+import pyarrow.dataset as ds
 from bank_reserves.model import BankReservesModel
 
 
+def make_runs(parameters, iterations=1):
+    """Expand a parameter dictionary into a list of (run_id, iteration, kwargs).
+
+    Values may either be single values or lists of values to sweep over.
+    """
+    names = list(parameters)
+    values = [
+        v if isinstance(v, list | tuple | range) else [v] for v in parameters.values()
+    ]
+    runs = []
+    for iteration in range(iterations):
+        for combination in itertools.product(*values):
+            runs.append((len(runs), iteration, dict(zip(names, combination))))
+    return runs
+
+
+def run_path(out_dir, iteration, kwargs):
+    """Return the file a run is written to, using hive style partition folders."""
+    partition = [f"{name}={value}" for name, value in kwargs.items()]
+    return os.path.join(out_dir, *partition, f"iteration={iteration}.parquet")
+
+
+def run_model(run, out_dir, max_steps=1000, seed=0):
+    """Run a single model and write all steps of it to a Parquet file.
+
+    The file is written under a temporary name first and then renamed, so a
+    run that gets interrupted never leaves a partial file behind.
+    """
+    run_id, iteration, kwargs = run
+    path = run_path(out_dir, iteration, kwargs)
+    # derive the seed from the run's parameters rather than its position in the
+    # sweep, so adding values to a sweep does not change results of earlier runs
+    run_seed = zlib.crc32(f"{seed}/{path}".encode())
+
+    model = BankReservesModel(**kwargs, rng=run_seed)
+    for _ in range(max_steps):
+        if not model.running:
+            break
+        model.step()
+
+    dc = model.datacollector
+    model_df = dc.get_model_vars_dataframe().rename_axis("Step").reset_index()
+    agent_df = dc.get_agent_vars_dataframe().reset_index()
+    df = agent_df.merge(model_df, on="Step")
+    df.insert(0, "RunId", run_id)
+    df.insert(1, "iteration", iteration)
+    df.insert(2, "Seed", run_seed)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def batch_run(
+    parameters,
+    out_dir,
+    iterations=1,
+    max_steps=1000,
+    number_processes=None,
+    seed=0,
+):
+    """Run a parameter sweep in a process pool, streaming each run to disk.
+
+    Args:
+        parameters: Dictionary of model parameters, single values or lists.
+        out_dir: Directory of the partitioned Parquet dataset.
+        iterations: Number of iterations for each parameter combination.
+        max_steps: Maximum number of steps per run.
+        number_processes: Number of worker processes, None uses all CPUs.
+        seed: Base seed, every run gets its own seed derived from it.
+
+    Returns:
+        List of the files written by this call.
+    """
+    all_runs = make_runs(parameters, iterations)
+    runs = [r for r in all_runs if not os.path.exists(run_path(out_dir, r[1], r[2]))]
+    total = len(all_runs)
+    print(f"{total - len(runs)} of {total} runs already done")
+
+    written = []
+    with ProcessPoolExecutor(max_workers=number_processes) as pool:
+        futures = [
+            pool.submit(run_model, run, out_dir, max_steps, seed) for run in runs
+        ]
+        for future in as_completed(futures):
+            written.append(future.result())
+            print(f"{total - len(runs) + len(written)}/{total} runs done")
+    return written
+
+
+def summarize(out_dir, by, column):
+    """Summarize a column of the dataset per group, streaming it batch by batch.
+
+    Only the columns needed are read, and every batch is reduced to sums per
+    group before the next one is read, so the dataset never has to fit in
+    memory.
+
+    Args:
+        out_dir: Directory of the partitioned Parquet dataset.
+        by: Names of the columns to group by, e.g. the swept parameters.
+        column: Name of the column to summarize.
+
+    Returns:
+        DataFrame with the count, mean, standard deviation, minimum and maximum
+        of the column for every group.
+    """
+    dataset = ds.dataset(out_dir, format="parquet", partitioning="hive")
+    partials = []
+    for batch in dataset.to_batches(columns=[*by, column]):
+        df = batch.to_pandas()
+        df["square"] = df[column] ** 2
+        partials.append(
+            df.groupby(by).agg(
+                count=(column, "count"),
+                sum=(column, "sum"),
+                square=("square", "sum"),
+                min=(column, "min"),
+                max=(column, "max"),
+            )
+        )
+
+    totals = (
+        pd.concat(partials)
+        .groupby(level=by)
+        .agg(
+            {"count": "sum", "sum": "sum", "square": "sum", "min": "min", "max": "max"}
+        )
+    )
+    count = totals["count"]
+    mean = totals["sum"] / count
+    variance = (totals["square"] - count * mean**2) / (count - 1)
+    return pd.DataFrame(
+        {
+            "count": count,
+            "mean": mean,
+            "std": np.sqrt(variance.clip(lower=0)),
+            "min": totals["min"],
+            "max": totals["max"],
+        }
+    )
+
+
 def main():
     # parameter lists for each parameter to be tested in batch run
     br_params = {
@@ -36,13 +194,8 @@ def main():
         "reserve_percent": 5,
     }
 
-    # The existing batch run logic here
-    data = mesa.batch_run(
-        BankReservesModel,
-        br_params,
-    )
-    br_df = pd.DataFrame(data)
-    br_df.to_csv("BankReservesModel_Data.csv")
+    batch_run(br_params, "BankReservesModel_Data", max_steps=1000)
+    print(summarize("BankReservesModel_Data", list(br_params), "Money"))
 
 
 if __name__ == "__main__":
@@ -13,7 +13,7 @@ import mesa
 import numpy as np
 from mesa.discrete_space import OrthogonalMooreGrid
 
-from .agents import Bank, Person
+from .agents import Bank, CellOccupancy, Person
 
 """
 If you want to perform a parameter sweep, call batch_run.py instead of run.py.
@@ -115,6 +115,9 @@ class Charts(mesa.Model):
             agent_reporters={"Wealth": lambda x: getattr(x, "wealth", None)},
         )
 
+        # index of people per cell, used by people to find trade partners
+        self.occupancy = CellOccupancy()
+
         # create a single bank for the model
         self.bank = Bank(self, self.reserve_percent)
 
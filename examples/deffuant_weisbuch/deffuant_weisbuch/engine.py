@@ -0,0 +1,115 @@
+import math
+
+import numpy as np
+
+
+class OpinionEngine:
+    """Bounded confidence interactions of pairs of agents on an array of opinions.
+
+    Interactions of pairs without agents in common do not influence each
+    other, so they are applied to the opinion array in one vectorized
+    operation instead of one at a time.
+
+    Attributes:
+        opinions (np.ndarray): The opinion of every agent.
+    """
+
+    def __init__(self, opinions, epsilon, mu, rng, sequential=False):
+        """Create a new opinion engine.
+
+        Args:
+            opinions (np.ndarray): Initial opinion of every agent.
+            epsilon (float): Confidence threshold for interaction.
+            mu (float): Convergence rate controlling opinion adjustment.
+            rng (np.random.Generator): Random number generator for the pairs.
+            sequential (bool): If False, a step is made of rounds of random
+                matchings, in which every agent interacts at most once. If True,
+                every pair is drawn independently and pairs interact strictly
+                one after another, like the agent based model.
+
+        Raises:
+            ValueError: If there are fewer than 2 agents to form a pair.
+        """
+        self.opinions = np.asarray(opinions, dtype=float)
+        if len(self.opinions) < 2:
+            raise ValueError("Pairs of agents need 2 agents at least.")
+        self.epsilon = epsilon
+        self.mu = mu
+        self.rng = rng
+        self.sequential = sequential
+
+        # Runs of independently drawn pairs without an agent in common are
+        # about sqrt(n) long (birthday problem), blocks are looked for in
+        # windows of a few times that
+        self.window = max(1, 2 * math.isqrt(len(self.opinions)))
+
+    def interact(self, first, second):
+        """Let pairs of agents without agents in common interact at once.
+
+        Args:
+            first (np.ndarray): First agent of every pair.
+            second (np.ndarray): Second agent of every pair.
+
+        Returns:
+            int: The number of pairs that were close enough to interact.
+        """
+        opinion_a = self.opinions[first]
+        opinion_b = self.opinions[second]
+        accepted = np.abs(opinion_a - opinion_b) < self.epsilon
+
+        opinion_a, opinion_b = opinion_a[accepted], opinion_b[accepted]
+        self.opinions[first[accepted]] = opinion_a + self.mu * (opinion_b - opinion_a)
+        self.opinions[second[accepted]] = opinion_b + self.mu * (opinion_a - opinion_b)
+        return int(np.count_nonzero(accepted))
+
+    def step(self, interactions):
+        """Let random pairs of agents interact.
+
+        Args:
+            interactions (int): Number of pairs that try to interact.
+
+        Returns:
+            int: The number of pairs that were close enough to interact.
+        """
+        if self.sequential:
+            return self._step_sequential(interactions)
+        return self._step_matching(interactions)
+
+    def _step_matching(self, interactions):
+        """Interactions in rounds of disjoint random matchings of all agents."""
+        n = len(self.opinions)
+        accepted = 0
+        while interactions > 0:
+            pairs = min(n // 2, interactions)
+            agents = self.rng.permutation(n)[: 2 * pairs]
+            accepted += self.interact(agents[0::2], agents[1::2])
+            interactions -= pairs
+        return accepted
+
+    def _step_sequential(self, interactions):
+        """Independently drawn pairs, applied in order.
+
+        The sequence of pairs is split into blocks of consecutive pairs without
+        an agent in common. Within a block the order does not matter, so every
+        block interacts at once and the result is the same as one pair at a time.
+        """
+        n = len(self.opinions)
+        first = self.rng.integers(n, size=interactions)
+        second = self.rng.integers(n - 1, size=interactions)
+        second += second >= first  # two different agents
+
+        accepted = 0
+        start = 0
+        while start < interactions:
+            stop = min(start + self.window, interactions)
+            agents = np.column_stack((first[start:stop], second[start:stop])).ravel()
+            _, first_seen = np.unique(agents, return_index=True)
+            repeated = np.ones(len(agents), dtype=bool)
+            repeated[first_seen] = False
+            repeats = np.flatnonzero(repeated)
+            if repeats.size:
+                # The block ends before the first pair with an agent seen before
+                stop = start + repeats[0] // 2
+            accepted += self.interact(first[start:stop], second[start:stop])
+            start = stop
+        return accepted
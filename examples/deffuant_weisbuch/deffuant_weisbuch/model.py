@@ -1,9 +1,11 @@
 import statistics
 
+import numpy as np
 from mesa import Model
 from mesa.datacollection import DataCollector
 
 from .agents import OpinionAgent
+from .engine import OpinionEngine
 
 
 class DeffuantWeisbuchModel(Model):
@@ -15,7 +17,7 @@ class DeffuantWeisbuchModel(Model):
     opinion toward each other.
     """
 
-    def __init__(self, n=100, epsilon=0.2, mu=0.5, rng=None):
+    def __init__(self, n=100, epsilon=0.2, mu=0.5, rng=None, interaction="agents"):
         """Initialize the model.
 
         Args:
@@ -23,6 +25,12 @@ class DeffuantWeisbuchModel(Model):
             epsilon (float): Confidence threshold for interaction.
             mu (float): Convergence rate controlling opinion adjustment.
             seed (int, optional): Random seed for reproducibility
+            interaction (str): "agents" lets OpinionAgent pairs interact one at
+                a time. "matching" and "sequential" keep the opinions in an
+                OpinionEngine array instead of agents, for populations of
+                millions: "matching" lets rounds of disjoint random pairs
+                interact at once, "sequential" keeps the one pair at a time
+                semantics of the agents. Agent opinions are then not collected.
         """
         super().__init__(rng=rng)
 
@@ -34,30 +42,52 @@ class DeffuantWeisbuchModel(Model):
         self.accepted_interactions = 0
         self.acceptance_rate = 0.0
 
+        if interaction not in ("agents", "matching", "sequential"):
+            raise ValueError(f"Unknown interaction: {interaction}")
+        self.engine = None
+        agent_reporters = {"opinion": "opinion"}
+        if interaction != "agents":
+            self.engine = OpinionEngine(
+                self.rng.uniform(-1, 1, self.n),
+                epsilon,
+                mu,
+                self.rng,
+                sequential=interaction == "sequential",
+            )
+            agent_reporters = {}
+
         self.datacollector = DataCollector(
             model_reporters={
                 "Variance": self.compute_variance,
                 "Acceptance Rate": lambda m: m.acceptance_rate,
                 "Cluster Count": self.compute_cluster_count,
             },
-            agent_reporters={"opinion": "opinion"},  # type: ignore[attr-defined]
+            agent_reporters=agent_reporters,
         )
 
-        OpinionAgent.create_agents(
-            model=self,
-            n=self.n,
-            opinion=[self.random.uniform(-1, 1) for _ in range(self.n)],
-        )
+        if self.engine is None:
+            OpinionAgent.create_agents(
+                model=self,
+                n=self.n,
+                opinion=[self.random.uniform(-1, 1) for _ in range(self.n)],
+            )
 
         self.datacollector.collect(self)
 
     def step(self):
         """Execute one model step.
 
-        A random pair of agents is selected. If their opinions differ by
-        less than the confidence threshold, both agents update opinion values
+        n times, a random pair of agents is selected. If their opinions differ
+        by less than the confidence threshold, both agents update opinion values
         symmetrically.
         """
+        if self.engine is not None:
+            self.accepted_interactions += self.engine.step(self.n)
+            self.attempted_interactions += self.n
+            self._update_acceptance_rate()
+            self.datacollector.collect(self)
+            return
+
         agent_list = self.agents.to_list()
         for _ in range(self.n):
             agent_a, agent_b = self.random.sample(agent_list, 2)
@@ -72,6 +102,10 @@ class DeffuantWeisbuchModel(Model):
 
                 self.accepted_interactions += 1
 
+        self._update_acceptance_rate()
+        self.datacollector.collect(self)
+
+    def _update_acceptance_rate(self):
         if self.attempted_interactions > 0:
             self.acceptance_rate = (
                 self.accepted_interactions / self.attempted_interactions
@@ -80,13 +114,17 @@ class DeffuantWeisbuchModel(Model):
         else:
             self.acceptance_rate = 0.0
 
-        self.datacollector.collect(self)
-
     def compute_variance(self):
+        if self.engine is not None:
+            return float(np.var(self.engine.opinions, ddof=1))
         opinions = [agent.opinion for agent in self.agents]  # type: ignore[attr-defined]
         return statistics.variance(opinions) if opinions else 0
 
     def compute_cluster_count(self, delta: float = 0.01) -> int:
+        if self.engine is not None:
+            gaps = np.diff(np.sort(self.engine.opinions))
+            return 1 + int(np.count_nonzero(np.abs(gaps) > delta))
+
         opinions = sorted(agent.opinion for agent in self.agents)  # type: ignore[attr-defined]
 
         if not opinions:
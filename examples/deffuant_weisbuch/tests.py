@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from deffuant_weisbuch.engine import OpinionEngine
+
+
+def test_sequential_engine():
+    # Testing that blocks of pairs give the same result as one pair at a time
+    n, interactions, epsilon, mu = 50, 1000, 0.5, 0.3
+    opinions = np.random.default_rng(0).uniform(-1, 1, n)
+    engine = OpinionEngine(
+        opinions.copy(), epsilon, mu, np.random.default_rng(1), sequential=True
+    )
+    accepted = engine.step(interactions)
+
+    # The same pairs as the engine draws, applied one after another
+    rng = np.random.default_rng(1)
+    first = rng.integers(n, size=interactions)
+    second = rng.integers(n - 1, size=interactions)
+    second += second >= first
+    expected_accepted = 0
+    for a, b in zip(first, second):
+        opinion_a, opinion_b = opinions[a], opinions[b]
+        if abs(opinion_a - opinion_b) < epsilon:
+            opinions[a] = opinion_a + mu * (opinion_b - opinion_a)
+            opinions[b] = opinion_b + mu * (opinion_a - opinion_b)
+            expected_accepted += 1
+
+    assert accepted == expected_accepted
+    assert np.array_equal(engine.opinions, opinions)
+
+
+@pytest.mark.parametrize("n", [0, 1])
+def test_engine_needs_pairs(n):
+    # Testing that too few agents to form a pair are rejected, not looped on
+    with pytest.raises(ValueError):
+        OpinionEngine(np.zeros(n), 0.2, 0.5, np.random.default_rng(0))
@@ -147,13 +147,9 @@ def SpaghettiBarChart(model):
     update_counter.get()
 
     # Collect data from philosophers
-    # We iterate through agents. Since it's a grid, we can just filter by type.
-    # We want them sorted by ID (position)
+    # The model keeps the philosophers in order of their seats
 
-    philosophers = []
-    philosophers = sorted(
-        model.agents_by_type[PhilosopherAgent], key=lambda p: p.position
-    )
+    philosophers = model.philosophers
 
     labels = [f"P{p.position // 2}" for p in philosophers]
     values = [p.total_eaten for p in philosophers]
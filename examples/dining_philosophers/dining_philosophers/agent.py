@@ -27,21 +27,72 @@ class ForkAgent(FixedAgent):
 class PhilosopherAgent(FixedAgent):
     def __init__(self, model):
         super().__init__(model)
+        self._state = None
         self.state = State.THINKING
         self.total_eaten = 0
-        self.ticks_since_state_change = 0
+        self._ticks = 0
+        self._state_changed_at = model.time
         self.total_wait_time = 0
         self.eating_count = 0
+        # Seating, set by the model once the table is laid
+        self.left_fork = None
+        self.right_fork = None
+        self.forks = ()
+        self.neighbors = ()
 
     @property
     def position(self):
         return self.cell.coordinate
 
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        # Keep the counters of the model up to date
+        counts = self.model.state_counts
+        if self._state is not None:
+            counts[self._state] -= 1
+        if self._state == State.HUNGRY:
+            del self.model.hungry[self]
+        counts[state] += 1
+        if state == State.HUNGRY:
+            self.model.hungry[self] = None
+        self._state = state
+
+    @property
+    def ticks_since_state_change(self):
+        # Event driven philosophers are not stepped, their time follows the model
+        if self.model.event_driven:
+            return self.model.time - self._state_changed_at
+        return self._ticks
+
+    @ticks_since_state_change.setter
+    def ticks_since_state_change(self, ticks):
+        self._ticks = ticks
+        self._state_changed_at = self.model.time - ticks
+
     def _start_eating(self):
-        self.total_wait_time += self.ticks_since_state_change
+        wait_time = self.ticks_since_state_change
+        self.total_wait_time += wait_time
         self.eating_count += 1
+        self.model.total_wait_time += wait_time
+        self.model.eating_count += 1
+        self.model.longest_wait = max(self.model.longest_wait, wait_time)
         self.state = State.EATING
         self.ticks_since_state_change = 0
+        if self.model.event_driven:
+            self.schedule_change(self.finish_eating, self.model.full_chance)
+
+    def _stop_eating(self):
+        self.put_down_forks()
+        self.state = State.THINKING
+        self.total_eaten += 1
+        self.model.total_eaten += 1
+        # (n + 1)² - n², for the Jain index
+        self.model.eaten_squares += 2 * self.total_eaten - 1
+        self.ticks_since_state_change = 0
 
     def step(self):
         self.ticks_since_state_change += 1
@@ -59,15 +110,32 @@ class PhilosopherAgent(FixedAgent):
         elif (
             self.state == State.EATING and self.random.random() < self.model.full_chance
         ):
-            self.put_down_forks()
-            self.state = State.THINKING
-            self.total_eaten += 1
-            self.ticks_since_state_change = 0
+            self._stop_eating()
 
-    def put_down_forks(self):
-        my_forks = self._get_neighbor_forks()
+    def schedule_change(self, change, chance):
+        """Schedule the change of state that happens with chance per step."""
+        holding_time = self.model.holding_time(chance)
+        if holding_time is not None:
+            self.model.schedule_event(change, after=holding_time)
 
-        for fork in my_forks:
+    def get_hungry(self):
+        """Event: stop thinking and try to eat right away."""
+        self.state = State.HUNGRY
+        self.ticks_since_state_change = 0
+        self.try_to_eat()
+
+    def finish_eating(self):
+        """Event: put down the forks, and let hungry neighbors try to take them."""
+        self._stop_eating()
+        self.schedule_change(self.get_hungry, self.model.hungry_chance)
+
+        # Only the neighbors sharing the forks can have been waiting for them
+        for p in self.random.sample(self.neighbors, len(self.neighbors)):
+            if p.state == State.HUNGRY:
+                p.try_to_eat()
+
+    def put_down_forks(self):
+        for fork in self.forks:
             if fork.owner == self:
                 fork.is_used = False
                 fork.owner = None
@@ -83,13 +151,8 @@ class PhilosopherAgent(FixedAgent):
             self.eat_strategy_cooperative()
 
     def eat_strategy_naive(self):
-        my_forks = self._get_neighbor_forks()
-
-        left_pos = (self.position - 1) % self.model.num_nodes
-        right_pos = (self.position + 1) % self.model.num_nodes
-
-        left_fork = next(f for f in my_forks if f.position == left_pos)
-        right_fork = next(f for f in my_forks if f.position == right_pos)
+        left_fork = self.left_fork
+        right_fork = self.right_fork
 
         if left_fork.owner != self and not left_fork.is_used:
             left_fork.is_used = True
@@ -104,7 +167,7 @@ class PhilosopherAgent(FixedAgent):
                 pass
 
     def eat_strategy_atomic(self):
-        my_forks = self._get_neighbor_forks()
+        my_forks = self.forks
 
         if all(not fork.is_used for fork in my_forks):
             for fork in my_forks:
@@ -113,24 +176,15 @@ class PhilosopherAgent(FixedAgent):
             self._start_eating()
 
     def eat_strategy_cooperative(self):
-        my_forks = self._get_neighbor_forks()
+        my_forks = self.forks
 
         # If any fork is used, we can't eat anyway
         if any(fork.is_used for fork in my_forks):
             return
 
         # Check neighbors
-        left_p_pos = (self.position - 2) % self.model.num_nodes
-        right_p_pos = (self.position + 2) % self.model.num_nodes
-
-        neighbors_p = [
-            p
-            for p in self.model.agents_by_type[PhilosopherAgent]
-            if p.position in (left_p_pos, right_p_pos)
-        ]
-
         should_yield = False
-        for p in neighbors_p:
+        for p in self.neighbors:
             if p.state == State.HUNGRY:
                 # Rule: Yield if neighbor has been waiting longer
                 if p.ticks_since_state_change > self.ticks_since_state_change:
@@ -154,9 +208,14 @@ class PhilosopherAgent(FixedAgent):
     def __repr__(self):
         return f"Phil-{self.position}({self.state.name})"
 
-    def _get_neighbor_forks(self):
-        return [
-            agent
-            for agent in self.cell.neighborhood.agents
-            if isinstance(agent, ForkAgent)
-        ]
+    def take_seat(self, left_fork, right_fork, left_neighbor, right_neighbor):
+        """Remember the forks and neighbors of this philosopher's seat.
+
+        The table does not change, so strategies look up forks and neighbors
+        here instead of searching the table every time.
+        """
+        self.left_fork = left_fork
+        self.right_fork = right_fork
+        # On tables of 1 or 2 philosophers both sides are the same
+        self.forks = tuple(dict.fromkeys((left_fork, right_fork)))
+        self.neighbors = tuple(dict.fromkeys((left_neighbor, right_neighbor)))
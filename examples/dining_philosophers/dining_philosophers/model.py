@@ -1,6 +1,7 @@
 import mesa
 import networkx as nx
 from mesa.discrete_space import Network
+from mesa.time import Schedule
 
 from .agent import ForkAgent, PhilosopherAgent, State
 
@@ -12,84 +13,142 @@ class DiningPhilosophersModel(mesa.Model):
         strategy="Naive",
         hungry_chance=0.1,
         full_chance=0.2,
+        event_driven=False,
+        holding_times="geometric",
+        rng=None,
     ):
-        super().__init__()
+        """Initialize the model.
+
+        Args:
+            num_philosophers (int): Number of philosophers at the table.
+            strategy (str): How philosophers pick up forks, "Naive", "Atomic"
+                or "Cooperative".
+            hungry_chance (float): Chance per step that a thinking philosopher
+                gets hungry.
+            full_chance (float): Chance per step that an eating philosopher is full.
+            event_driven (bool): Whether philosophers schedule their next change
+                of state as an event, instead of drawing for it on every step.
+                Hungry philosophers then only try to eat again when a fork next
+                to them is put down.
+            holding_times (str): How long thinking and eating last in an event
+                driven model, "geometric" (whole steps, like the stepped model)
+                or "exponential" (continuous time, with the same mean).
+            rng: Random number generator seed.
+        """
+        super().__init__(rng=rng)
+        if holding_times not in ("geometric", "exponential"):
+            raise ValueError(f"Unknown holding times: {holding_times}")
 
         self.strategy = strategy
         self.hungry_chance = hungry_chance
         self.full_chance = full_chance
+        self.event_driven = event_driven
+        self.holding_times = holding_times
         self.num_nodes = num_philosophers * 2
 
+        # Counters kept up to date by the philosophers, so reporters do not
+        # have to look at every philosopher
+        self.state_counts = dict.fromkeys(State, 0)
+        self.hungry = {}  # hungry philosophers, the longest waiting first
+        self.total_eaten = 0
+        self.eaten_squares = 0  # sum of the squares of total_eaten
+        self.total_wait_time = 0
+        self.eating_count = 0
+        self.longest_wait = 0
+
         self.G = nx.circulant_graph(self.num_nodes, [1])
         self.grid = Network(self.G, random=self.random)
 
+        # Philosopher i sits at node 2i, between forks i - 1 and i
+        self.philosophers = []
+        self.forks = []
         for node_id in range(self.num_nodes):
             node_cell = self.grid[node_id]
             if node_id % 2 == 0:
                 p = PhilosopherAgent(self)
                 p.cell = node_cell
+                self.philosophers.append(p)
             else:
                 f = ForkAgent(self)
                 f.cell = node_cell
+                self.forks.append(f)
+
+        for i, p in enumerate(self.philosophers):
+            p.take_seat(
+                left_fork=self.forks[i - 1],
+                right_fork=self.forks[i],
+                left_neighbor=self.philosophers[i - 1],
+                right_neighbor=self.philosophers[(i + 1) % num_philosophers],
+            )
 
         model_reporters = {
-            "Eating": lambda m: len(
-                [
-                    p
-                    for p in m.agents_by_type[PhilosopherAgent]
-                    if p.state == State.EATING
-                ]
-            ),
-            "Hungry": lambda m: len(
-                [
-                    p
-                    for p in m.agents_by_type[PhilosopherAgent]
-                    if p.state == State.HUNGRY
-                ]
-            ),
-            "Thinking": lambda m: len(
-                [
-                    p
-                    for p in m.agents_by_type[PhilosopherAgent]
-                    if p.state == State.THINKING
-                ]
-            ),
-            "Avg Wait Time": lambda m: (
-                (
-                    sum(p.total_wait_time for p in m.agents_by_type[PhilosopherAgent])
-                    / sum(p.eating_count for p in m.agents_by_type[PhilosopherAgent])
-                )
-                if sum(p.eating_count for p in m.agents_by_type[PhilosopherAgent]) > 0
-                else 0
-            ),
-            "Throughput": lambda m: (
-                (
-                    sum(p.total_eaten for p in m.agents_by_type[PhilosopherAgent])
-                    / m.time
-                )
-                if m.time > 0
-                else 0
-            ),
+            "Eating": lambda m: m.state_counts[State.EATING],
+            "Hungry": lambda m: m.state_counts[State.HUNGRY],
+            "Thinking": lambda m: m.state_counts[State.THINKING],
+            "Avg Wait Time": lambda m: m.avg_wait_time,
+            "Throughput": lambda m: m.total_eaten / m.time if m.time > 0 else 0,
+            "Jain Index": lambda m: m.jain_index,
+            "Max Starvation": lambda m: m.max_starvation,
         }
 
         # Add reporters for individual philosopher's consumption
         # Max 10 philosophers as per slider
         for i in range(10):
-            # i-th philosopher has node_id = i * 2
-            p_id = i * 2
-
-            # Use default argument in lambda to capture the current value of p_id
-            model_reporters[f"P{i}"] = lambda m, pid=p_id: next(
-                (
-                    p.total_eaten
-                    for p in m.agents_by_type[PhilosopherAgent]
-                    if p.position == pid
-                ),
-                0,
+            # Use default argument in lambda to capture the current value of i
+            model_reporters[f"P{i}"] = lambda m, i=i: (
+                m.philosophers[i].total_eaten if i < len(m.philosophers) else 0
             )
 
         self.datacollector = mesa.DataCollector(model_reporters=model_reporters)
 
+        if event_driven:
+            # Disable default step schedule, philosophers schedule their own
+            # changes of state, and data is collected once per time unit
+            self._default_schedule.stop()
+            for p in self.philosophers:
+                p.schedule_change(p.get_hungry, hungry_chance)
+            self.schedule_recurring(self._collect, Schedule(interval=1, start=1))
+
+    @property
+    def avg_wait_time(self):
+        """Average time philosophers were hungry before they could eat."""
+        if self.eating_count == 0:
+            return 0
+        return self.total_wait_time / self.eating_count
+
+    @property
+    def jain_index(self):
+        """Jain's fairness index of how much every philosopher has eaten.
+
+        1 if all have eaten the same, down to 1 / n if one philosopher ate it all.
+        """
+        if self.eaten_squares == 0:
+            return 1.0
+        return self.total_eaten**2 / (len(self.philosophers) * self.eaten_squares)
+
+    @property
+    def max_starvation(self):
+        """Longest time a philosopher has been hungry, counting those still waiting."""
+        waiting = next(iter(self.hungry), None)
+        if waiting is None:
+            return self.longest_wait
+        return max(self.longest_wait, waiting.ticks_since_state_change)
+
+    def _collect(self):
+        self.datacollector.collect(self)
+
+    def holding_time(self, chance):
+        """Draw how long a state lasts that ends with chance per step.
+
+        Returns:
+            The holding time, or None if the state never ends.
+        """
+        if chance <= 0:
+            return None
+        if self.holding_times == "exponential":
+            return float(self.rng.exponential(1 / chance))
+        return int(self.rng.geometric(chance))
+
     def step(self):
         self.agents_by_type[PhilosopherAgent].shuffle_do("step")
         self.datacollector.collect(self)
@@ -3,46 +3,39 @@ import numpy as np
 
 
 class BarCustomer(mesa.Agent):
-    def __init__(self, model, memory_size, crowd_threshold, num_strategies):
+    """A customer deciding every week whether to go to the bar.
+
+    The strategies and state of all customers are kept in arrays by the model,
+    the customer reads them from its row, index.
+    """
+
+    def __init__(self, model, index):
         super().__init__(model)
-        # Random values from -1.0 to 1.0
-        self.strategies = np.random.rand(num_strategies, memory_size + 1) * 2 - 1
-        self.best_strategy = self.strategies[0]
-        self.attend = False
-        self.memory_size = memory_size
-        self.crowd_threshold = crowd_threshold
-        self.utility = 0
-        self.update_strategies()
-
-    def update_attendance(self):
-        prediction = self.predict_attendance(
-            self.best_strategy, self.model.history[-self.memory_size :]
-        )
-        if prediction <= self.crowd_threshold:
-            self.attend = True
-            self.model.attendance += 1
-        else:
-            self.attend = False
-
-    def update_strategies(self):
-        # Pick the best strategy based on new history window
-        best_score = float("inf")
-        for strategy in self.strategies:
-            score = 0
-            for week in range(self.memory_size):
-                last = week + self.memory_size
-                prediction = self.predict_attendance(
-                    strategy, self.model.history[week:last]
-                )
-                score += abs(self.model.history[last] - prediction)
-            if score <= best_score:
-                best_score = score
-                self.best_strategy = strategy
-        should_attend = self.model.history[-1] <= self.crowd_threshold
-        if should_attend != self.attend:
-            self.utility -= 1
-        else:
-            self.utility += 1
+        self.index = index
+
+    @property
+    def memory_size(self):
+        return self.model.memory_size
+
+    @property
+    def crowd_threshold(self):
+        return self.model.crowd_threshold
+
+    @property
+    def strategies(self):
+        return self.model.engine.strategies[self.index]
+
+    @property
+    def best_strategy(self):
+        return self.strategies[self.model.engine.best[self.index]]
+
+    @property
+    def attend(self):
+        return bool(self.model.attend[self.index])
+
+    @property
+    def utility(self):
+        return int(self.model.utility[self.index])
 
     def predict_attendance(self, strategy, subhistory):
         # This is extracted from the source code of the model in
@@ -60,4 +53,5 @@ class BarCustomer(mesa.Agent):
         # prediction formula. one can think of it as the the agent's prediction
         # of the bar's attendance in the absence of any other data then we
         # multiply each week in the history by its respective weight.
+        # StrategyEngine computes the same for all strategies of all agents.
         return strategy[0] * 100 + np.dot(strategy[1:], subhistory)
@@ -0,0 +1,60 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+class StrategyEngine:
+    """Scores and applies the strategies of all customers at once.
+
+    The strategies of all customers are one (agents, strategies, memory + 1)
+    array, so every strategy of every customer is scored against the history
+    with one batched matrix multiplication, instead of a call to
+    `BarCustomer.predict_attendance` per strategy and week.
+
+    Args:
+        strategies: Array of shape (agents, strategies, memory + 1), the first
+            weight of every strategy is its constant.
+        chunk_size: Number of customers scored at once, which bounds the
+            memory used for predictions.
+    """
+
+    def __init__(self, strategies, chunk_size=2**14):
+        self.strategies = strategies
+        self.memory_size = strategies.shape[2] - 1
+        self.chunk_size = chunk_size
+        self.best = np.zeros(len(strategies), dtype=np.intp)
+
+    def _chunks(self):
+        for start in range(0, len(self.strategies), self.chunk_size):
+            yield slice(start, start + self.chunk_size)
+
+    def update_strategies(self, history):
+        """Pick the best strategy of every customer, given twice the memory of history.
+
+        A strategy is scored by how far its predictions of the last memory_size
+        weeks are off, each made from the memory_size weeks before it.
+        """
+        history = np.asarray(history, dtype=float)
+        memory = self.memory_size
+        windows = sliding_window_view(history[:-1], memory)  # one row per week
+        # Column w is the input of the prediction of week w: the constant's
+        # 100 followed by the memory_size weeks before it
+        inputs = np.vstack([np.full(memory, 100.0), windows.T])
+        targets = history[memory:]
+
+        num_strategies = self.strategies.shape[1]
+        for chunk in self._chunks():
+            # One matrix product for all strategies of the chunk's customers
+            weights = self.strategies[chunk].reshape(-1, memory + 1)
+            predictions = (weights @ inputs).reshape(-1, num_strategies, memory)
+            scores = np.abs(targets - predictions).sum(axis=2)
+            # Of equal scores the last strategy wins
+            self.best[chunk] = num_strategies - 1 - scores[:, ::-1].argmin(axis=1)
+
+    def predict(self, history):
+        """Return the prediction of the best strategy of every customer for next week."""
+        inputs = np.concatenate([[100.0], history[-self.memory_size :]])
+        predictions = np.empty(len(self.strategies))
+        for chunk in self._chunks():
+            rows = np.arange(chunk.start, min(chunk.stop, len(self.strategies)))
+            predictions[chunk] = self.strategies[rows, self.best[chunk]] @ inputs
+        return predictions
@@ -0,0 +1,65 @@
+import numpy as np
+
+
+class AttendanceHistory:
+    """The attendance of the last weeks, in a fixed-size NumPy ring buffer.
+
+    Every week is written twice, capacity apart, so the last capacity weeks are
+    always one contiguous slice of the buffer. Windows of the history are
+    read-only views of that slice, nothing is copied or shifted when a week
+    is added.
+
+    Args:
+        values: Initial attendance, the oldest week first. Its length is the
+            number of weeks kept.
+        path: File to write the full attendance series to, initial weeks
+            included, for runs longer than the history. None keeps no series.
+    """
+
+    def __init__(self, values, path=None):
+        values = np.asarray(values, dtype=np.int64)
+        self.capacity = len(values)
+        self._buffer = np.concatenate([values, values])
+        self._start = 0  # position of the oldest week in the buffer
+        self.path = path
+        self._file = None
+        if path is not None:
+            self._file = open(path, "wb")  # noqa: SIM115
+            values.tofile(self._file)
+
+    def append(self, attendance):
+        """Add the attendance of a new week, forgetting the oldest week."""
+        self._buffer[self._start] = attendance
+        self._buffer[self._start + self.capacity] = attendance
+        self._start = (self._start + 1) % self.capacity
+        if self._file is not None:
+            self._file.write(np.int64(attendance).tobytes())
+
+    @property
+    def window(self):
+        """View of the history, the oldest week first."""
+        window = self._buffer[self._start : self._start + self.capacity]
+        window.flags.writeable = False
+        return window
+
+    def __getitem__(self, key):
+        return self.window[key]
+
+    def __len__(self):
+        return self.capacity
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.window, dtype=dtype)
+
+    def series(self):
+        """Return the full attendance series as a memory-mapped array."""
+        if self._file is None:
+            raise ValueError("The history was created without a path.")
+        self._file.flush()
+        return np.memmap(self.path, dtype=np.int64, mode="r")
+
+    def close(self):
+        """Close the file of the attendance series."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -2,6 +2,8 @@ import mesa
 import numpy as np
 
 from .agents import BarCustomer
+from .engine import StrategyEngine
+from .history import AttendanceHistory
 
 
 class ElFarolBar(mesa.Model):
@@ -11,20 +13,34 @@ class ElFarolBar(mesa.Model):
         num_strategies=10,
         memory_size=10,
         num_agents=100,
+        history_file=None,
     ):
         super().__init__()
         self.running = True
         self.num_agents = num_agents
+        self.crowd_threshold = crowd_threshold
+        self.memory_size = memory_size
 
         # Initialize the previous attendance randomly so the agents have a history
         # to work with from the start.
         # The history is twice the memory, because we need at least a memory
         # worth of history for each point in memory to test how well the
         # strategies would have worked.
-        self.history = np.random.randint(0, 100, size=memory_size * 2).tolist()
-        self.attendance = self.history[-1]
-        for _ in range(self.num_agents):
-            BarCustomer(self, memory_size, crowd_threshold, num_strategies)
+        # The full attendance series can be kept in history_file as well.
+        self.history = AttendanceHistory(
+            np.random.randint(0, 100, size=memory_size * 2), history_file
+        )
+        self.attendance = int(self.history[-1])
+
+        # Strategy weights are random values from -1.0 to 1.0, all agents'
+        # strategies are scored at once by the engine
+        strategies = np.random.rand(num_agents, num_strategies, memory_size + 1)
+        self.engine = StrategyEngine(strategies * 2 - 1)
+        self.engine.update_strategies(self.history)
+        self.attend = np.zeros(num_agents, dtype=bool)
+        self.utility = np.zeros(num_agents, dtype=int)
+        self._update_utility()
+        BarCustomer.create_agents(self, num_agents, np.arange(num_agents))
 
         self.datacollector = mesa.DataCollector(
             model_reporters={"Customers": "attendance"},
@@ -33,10 +49,19 @@ class ElFarolBar(mesa.Model):
 
     def step(self):
         self.datacollector.collect(self)
-        self.attendance = 0
-        self.agents.shuffle_do("update_attendance")
-        # We ensure that the length of history is constant
-        # after each step.
-        self.history.pop(0)
+        predictions = self.engine.predict(self.history)
+        self.attend = predictions <= self.crowd_threshold
+        self.attendance = int(self.attend.sum())
+        # The history keeps a constant length, the oldest week is dropped
         self.history.append(self.attendance)
-        self.agents.shuffle_do("update_strategies")
+        self.engine.update_strategies(self.history)
+        self._update_utility()
+
+    def close(self):
+        """Close the history file, if the model keeps one."""
+        self.history.close()
+
+    def _update_utility(self):
+        # Agents gain utility if they decided as they should have
+        should_attend = self.history[-1] <= self.crowd_threshold
+        self.utility += np.where(self.attend == should_attend, 1, -1)
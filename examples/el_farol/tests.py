@@ -1,4 +1,5 @@
 import numpy as np
+from el_farol.history import AttendanceHistory
 from el_farol.model import ElFarolBar
 
 np.random.seed(1)
@@ -19,3 +20,31 @@ def test_convergence():
     standard_deviation = np.std(attendances)
     deviation = abs(mean - crowd_threshold)
     assert deviation < standard_deviation
+
+
+def test_history(tmp_path):
+    # Testing that the ring buffer behaves like a list of the last weeks
+    values = np.random.randint(0, 100, size=20)
+    history = AttendanceHistory(values, tmp_path / "attendance.bin")
+    expected = values.tolist()
+    for attendance in np.random.randint(0, 100, size=50):
+        history.append(attendance)
+        expected = [*expected[1:], attendance]
+        assert history.window.tolist() == expected
+        assert history[-10:].tolist() == expected[-10:]
+    assert np.shares_memory(history.window, history[3:7])
+    assert history.series().tolist()[-20:] == expected
+    assert len(history.series()) == 70
+    history.close()
+
+
+def test_history_file(tmp_path):
+    # Testing that the model writes every week to its history file
+    model = ElFarolBar(memory_size=5, history_file=tmp_path / "attendance.bin")
+    for _ in range(10):
+        model.step()
+    series = model.history.series()
+    assert len(series) == 20
+    assert series[-1] == model.attendance
+    model.close()
+    assert model.history._file is None
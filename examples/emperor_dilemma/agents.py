@@ -30,6 +30,8 @@ class EmperorAgent(FixedAgent):
         Calculates social pressure from neighbors and updates compliance and
         enforcement states based on conviction and costs.
         """
+        compliance, enforcement = self.compliance, self.enforcement
+
         # 1. Observe Neighbors
         neighbors = []
         if self.cell is not None:
@@ -62,3 +64,6 @@ class EmperorAgent(FixedAgent):
                 self.enforcement = self.private_belief
             else:
                 self.enforcement = 0
+
+        if (self.compliance, self.enforcement) != (compliance, enforcement):
+            self.model.record_change(self, compliance, enforcement)
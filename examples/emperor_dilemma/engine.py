@@ -0,0 +1,139 @@
+import numpy as np
+
+NUM_NEIGHBORS = 8  # Moore neighborhood
+
+
+def checkerboard_classes(shape):
+    """Splits a torus into classes of cells of which no two are neighbors.
+
+    Cells are colored by the parity of their coordinates, with an extra color
+    for the last row or column of an odd size, whose neighbor across the edge
+    would otherwise have the same parity.
+
+    Returns:
+        List of boolean masks, one per class.
+    """
+    colors = []
+    for size in shape:
+        color = np.arange(size) % 2
+        if size % 2:
+            color[-1] = 2
+        colors.append(color)
+    classes = colors[0][:, None] * 3 + colors[1][None, :]
+    return [classes == c for c in np.unique(classes)]
+
+
+class EmperorLattice:
+    """Citizens of the Emperor's Dilemma as arrays over a torus.
+
+    Belief, conviction, compliance and enforcement are arrays of the shape of
+    the grid. Social pressure and the fraction of deviant neighbors come from
+    convolutions with the 8 neighbors of every cell, so a step costs a few
+    array operations, however large the lattice.
+
+    Args:
+        belief: Private belief of every citizen, -1 or 1.
+        conviction: Strength of conviction of every citizen.
+        k: The cost of enforcement.
+        activation: "synchronous" updates all citizens at once from the state
+            of the previous step. "checkerboard" updates classes of citizens
+            that are not neighbors of each other one after another, in random
+            order, which behaves like a random sequential activation.
+        rng: Random number generator or seed for the order of the classes.
+    """
+
+    def __init__(self, belief, conviction, k, activation="synchronous", rng=None):
+        self.belief = np.asarray(belief, dtype=np.int8)
+        self.conviction = np.asarray(conviction, dtype=float)
+        self.k = k
+        self.compliance = self.belief.copy()
+        self.enforcement = np.zeros_like(self.belief)
+        self.rng = np.random.default_rng(rng)
+
+        if activation == "synchronous":
+            self.classes = [None]
+        elif activation == "checkerboard":
+            self.classes = checkerboard_classes(self.belief.shape)
+        else:
+            raise ValueError(f"Unknown activation: {activation}")
+        self.activation = activation
+
+    def neighbor_sum(self, values):
+        """Return the sum of the values of the 8 neighbors of every cell.
+
+        This is the toroidal convolution with a 3 x 3 kernel of ones with a 0
+        in the middle, as a sum of 8 shifted views of the wrapped array, which
+        is much faster than a general convolution.
+        """
+        padded = np.pad(values.astype(np.int16), 1, mode="wrap")
+        rows, cols = values.shape
+        return sum(
+            padded[dx : dx + rows, dy : dy + cols]
+            for dx in range(3)
+            for dy in range(3)
+            if (dx, dy) != (1, 1)
+        )
+
+    def update(self, mask=None):
+        """Update the citizens in mask, or all of them at once if mask is None.
+
+        Returns:
+            The number of citizens whose compliance or enforcement changed.
+        """
+        belief = self.belief
+        conviction = self.conviction
+
+        # Social pressure (Eq 1), citizens give in if it beats their conviction
+        pressure = -belief * self.neighbor_sum(self.enforcement) / NUM_NEIGHBORS
+        gives_in = pressure > conviction
+        compliance = np.where(gives_in, -belief, belief)
+
+        # Enforcement (Eq 2 & 3), a neighbor deviates if its compliance differs
+        # from the belief, so the deviants follow from the sum of compliance
+        deviant = (NUM_NEIGHBORS - belief * self.neighbor_sum(self.compliance)) // 2
+        w = deviant / NUM_NEIGHBORS
+        enforcement = np.select(
+            [
+                gives_in & (pressure > conviction + self.k),
+                ~gives_in & (conviction * w > self.k),
+            ],
+            [-belief, belief],
+            0,
+        ).astype(np.int8)
+
+        changed = (compliance != self.compliance) | (enforcement != self.enforcement)
+        if mask is None:
+            self.compliance[:] = compliance
+            self.enforcement[:] = enforcement
+            return int(changed.sum())
+        np.copyto(self.compliance, compliance, where=mask)
+        np.copyto(self.enforcement, enforcement, where=mask)
+        return int((changed & mask).sum())
+
+    def step(self):
+        """Update every citizen once.
+
+        Returns:
+            The number of citizens whose compliance or enforcement changed.
+        """
+        changed = 0
+        for index in self.rng.permutation(len(self.classes)):
+            changed += self.update(self.classes[index])
+        return changed
+
+    # --- Metrics ---
+
+    @property
+    def compliance_rate(self):
+        return float(np.mean(self.compliance == 1))
+
+    @property
+    def enforcement_rate(self):
+        return float(np.mean(self.enforcement == 1))
+
+    @property
+    def false_enforcement_rate(self):
+        disbelievers = self.belief == -1
+        if not disbelievers.any():
+            return 0
+        return float(np.mean(self.enforcement[disbelievers] == 1))
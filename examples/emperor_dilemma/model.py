@@ -1,10 +1,10 @@
-import random
-
+import numpy as np
 from mesa import Model
 from mesa.datacollection import DataCollector
 from mesa.discrete_space.grid import OrthogonalMooreGrid
 
 from .agents import EmperorAgent
+from .engine import EmperorLattice
 
 
 class EmperorModel(Model):
@@ -21,6 +21,7 @@ class EmperorModel(Model):
         k=0.125,
         homophily=False,
         rng=None,
+        activation="random",
     ):
         """Initializes the EmperorModel.
 
@@ -31,6 +32,10 @@ class EmperorModel(Model):
             k (float): Enforcement cost. Defaults to 0.125.
             homophily (bool): Whether to cluster believers. Defaults to False.
             rng (int): Random seed. Defaults to None.
+            activation (str): "random" activates citizen agents one at a time,
+                in random order. "synchronous" and "checkerboard" keep the
+                citizens in an EmperorLattice of arrays instead of agents, which
+                runs grids of a million citizens. Defaults to "random".
         """
         super().__init__(rng=rng)
 
@@ -39,10 +44,16 @@ class EmperorModel(Model):
         self.fraction_true_believers = fraction_true_believers
         self.k = k
         self.homophily = homophily
+        self.activation = activation
+        self.changed = 0  # citizens whose behavior changed in the last step
 
-        self.grid = OrthogonalMooreGrid(
-            (width, height), torus=True, capacity=1, random=self.random
-        )
+        # Citizens are either agents on a grid or arrays of a lattice
+        self.grid = None
+        self.lattice = None
+        if activation == "random":
+            self.grid = OrthogonalMooreGrid(
+                (width, height), torus=True, capacity=1, random=self.random
+            )
 
         self.datacollector = DataCollector(
             model_reporters={
@@ -81,7 +92,17 @@ class EmperorModel(Model):
                 by = (start_y + (i // int(num_believers**0.5 + 1))) % self.height
                 believer_coords.add((bx, by))
         else:
-            believer_coords = set(random.sample(all_coords, num_believers))
+            believer_coords = set(self.random.sample(all_coords, num_believers))
+
+        if self.grid is None:
+            self.init_lattice(believer_coords)
+            return
+
+        # Counts kept up to date as agents change, for the reporters
+        self.num_complying = len(believer_coords)
+        self.num_enforcing = 0
+        self.num_disbelievers = num_agents - len(believer_coords)
+        self.num_false_enforcing = 0
 
         for x, y in all_coords:
             if (x, y) in believer_coords:
@@ -89,7 +110,7 @@ class EmperorModel(Model):
                 conviction = 1.0
             else:
                 p_belief = -1
-                conviction = random.uniform(0.01, 0.38)
+                conviction = self.random.uniform(0.01, 0.38)
 
             agent = EmperorAgent(self, p_belief, conviction, self.k)
 
@@ -101,27 +122,67 @@ class EmperorModel(Model):
 
             self.agents.add(agent)
 
+    def init_lattice(self, believer_coords):
+        """Initializes the arrays of the lattice instead of agents.
+
+        Args:
+            believer_coords (set): Coordinates of the true believers.
+        """
+        shape = (self.width, self.height)
+        belief = np.full(shape, -1, dtype=np.int8)
+        if believer_coords:
+            belief[tuple(np.array(list(believer_coords)).T)] = 1
+        conviction = np.where(belief == 1, 1.0, self.rng.uniform(0.01, 0.38, shape))
+        self.lattice = EmperorLattice(
+            belief, conviction, self.k, self.activation, rng=self.rng
+        )
+
+    def record_change(self, agent, compliance, enforcement):
+        """Updates the counts after an agent changed its behavior.
+
+        Args:
+            agent (EmperorAgent): The agent that changed.
+            compliance (int): The agent's compliance before the change.
+            enforcement (int): The agent's enforcement before the change.
+        """
+        self.changed += 1
+        self.num_complying += (agent.compliance == 1) - (compliance == 1)
+        enforcing = (agent.enforcement == 1) - (enforcement == 1)
+        self.num_enforcing += enforcing
+        if agent.private_belief == -1:
+            self.num_false_enforcing += enforcing
+
     def step(self):
         """Executes one step of the model.
 
-        Shuffles agents and activates them (random order), then collects data.
+        Shuffles agents and activates them (random order), or updates the
+        lattice, then collects data. Afterwards changed is the number of
+        citizens whose behavior changed in this step.
         """
-        self.agents.shuffle_do("step")
+        self.changed = 0
+        if self.lattice is None:
+            self.agents.shuffle_do("step")
+        else:
+            self.changed = self.lattice.step()
         self.datacollector.collect(self)
 
 
 def compute_compliance(model):
     """Computes the compliance rate of the population."""
+    if model.lattice is not None:
+        return model.lattice.compliance_rate
     if not model.agents:
         return 0
-    return sum(1 for a in model.agents if a.compliance == 1) / len(model.agents)
+    return model.num_complying / len(model.agents)
 
 
 def compute_enforcement(model):
     """Computes the enforcement rate of the population."""
+    if model.lattice is not None:
+        return model.lattice.enforcement_rate
     if not model.agents:
         return 0
-    return sum(1 for a in model.agents if a.enforcement == 1) / len(model.agents)
+    return model.num_enforcing / len(model.agents)
 
 
 def compute_false_enforcement(model):
@@ -129,7 +190,8 @@ def compute_false_enforcement(model):
 
     This is defined as the fraction of disbelievers who are enforcing the norm.
     """
-    disbelievers = [a for a in model.agents if a.private_belief == -1]
-    if not disbelievers:
+    if model.lattice is not None:
+        return model.lattice.false_enforcement_rate
+    if not model.num_disbelievers:
         return 0
-    return sum(1 for a in disbelievers if a.enforcement == 1) / len(disbelievers)
+    return model.num_false_enforcing / model.num_disbelievers
@@ -0,0 +1,159 @@
+"""Seeded, parallel phase-diagram sweep of the Emperor's Dilemma.
+
+Every combination of k, fraction_true_believers and homophily is run for a
+number of replications, each with its own seed, in a process pool. A run stops
+once no citizen has changed its behavior for a number of steps, and the final
+rates of all runs are averaged into a compact phase-diagram table.
+
+Run from the examples directory with `python -m emperor_dilemma.sweep`.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .model import (
+    EmperorModel,
+    compute_compliance,
+    compute_enforcement,
+    compute_false_enforcement,
+)
+
+METRICS = {
+    "compliance": compute_compliance,
+    "enforcement": compute_enforcement,
+    "false_enforcement": compute_false_enforcement,
+}
+
+
+def run_seed(seed, run):
+    """Return the seed of a run, independent of how runs are distributed."""
+    return int(np.random.SeedSequence([seed, run]).generate_state(1)[0])
+
+
+def run_point(params, max_steps=200, patience=10):
+    """Run the model until it converges and return its final state.
+
+    Args:
+        params: Dictionary of EmperorModel parameters, including rng.
+        max_steps: Maximum number of steps.
+        patience: The model has converged once no citizen has changed its
+            behavior for this many steps in a row.
+
+    Returns:
+        Dictionary of the parameters, the number of steps, whether the run
+        converged and the final value of every metric.
+    """
+    model = EmperorModel(**params)
+    stable = 0
+    while model.steps < max_steps and stable < patience:
+        model.step()
+        stable = stable + 1 if model.changed == 0 else 0
+    return (
+        params
+        | {"steps": model.steps, "converged": stable >= patience}
+        | {name: metric(model) for name, metric in METRICS.items()}
+    )
+
+
+def sweep(
+    k_values,
+    fractions,
+    homophily=(False, True),
+    replications=1,
+    width=100,
+    height=100,
+    activation="checkerboard",
+    max_steps=200,
+    patience=10,
+    number_processes=None,
+    seed=0,
+):
+    """Run the model for every combination of parameters in a process pool.
+
+    Args:
+        k_values: Enforcement costs to run.
+        fractions: Fractions of true believers to run.
+        homophily: Homophily settings to run.
+        replications: Number of runs of every combination.
+        width: Width of the grid.
+        height: Height of the grid.
+        activation: Activation of the model, see EmperorModel.
+        max_steps: Maximum number of steps of a run.
+        patience: Number of steps without change after which a run stops.
+        number_processes: Number of worker processes, None uses all CPUs.
+        seed: Base seed, every run gets its own seed derived from it.
+
+    Returns:
+        DataFrame with one row per run, in order of the parameters.
+    """
+    combinations = itertools.product(
+        homophily, fractions, k_values, range(replications)
+    )
+    runs = [
+        {
+            "width": width,
+            "height": height,
+            "fraction_true_believers": fraction,
+            "k": k,
+            "homophily": clustered,
+            "activation": activation,
+            "rng": run_seed(seed, run),
+        }
+        for run, (clustered, fraction, k, _) in enumerate(combinations)
+    ]
+    workers = number_processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        rows = pool.map(
+            run_point,
+            runs,
+            [max_steps] * len(runs),
+            [patience] * len(runs),
+            chunksize=max(1, len(runs) // (4 * workers)),
+        )
+        return pd.DataFrame(list(rows))
+
+
+def phase_diagram(results):
+    """Average the runs of every combination of parameters into a compact table.
+
+    Args:
+        results: DataFrame with one row per run, as returned by sweep.
+
+    Returns:
+        DataFrame with one row per combination of homophily,
+        fraction_true_believers and k, with the mean of every metric, the
+        mean number of steps and the fraction of runs that converged.
+    """
+    table = results.groupby(
+        ["homophily", "fraction_true_believers", "k"], as_index=False
+    ).agg(
+        runs=("rng", "size"),
+        steps=("steps", "mean"),
+        converged=("converged", "mean"),
+        **{name: (name, "mean") for name in METRICS},
+    )
+    columns = ["fraction_true_believers", "k", "steps", "converged", *METRICS]
+    return table.astype(dict.fromkeys(columns, np.float32) | {"runs": np.int32})
+
+
+if __name__ == "__main__":
+    K_VALUES = np.round(np.linspace(0.0, 0.25, 11), 3)
+    FRACTIONS = np.round(np.linspace(0.0, 0.2, 11), 3)
+    OUTPUT = "phase_diagram.csv"
+
+    results = sweep(K_VALUES, FRACTIONS, replications=4)
+    table = phase_diagram(results)
+    table.to_csv(OUTPUT, index=False, float_format="%.4g")
+
+    print(f"{len(results)} runs, {results['converged'].mean():.0%} converged")
+    print(f"Phase diagram written to {OUTPUT}\n")
+    for clustered, rows in table.groupby("homophily"):
+        print(f"Compliance, homophily={clustered} (rows: fraction, columns: k)")
+        diagram = rows.pivot(
+            index="fraction_true_believers", columns="k", values="compliance"
+        )
+        print(diagram.to_string(float_format="{:.2f}".format), "\n")
@@ -42,12 +42,81 @@ class Beneficiary(CellAgent):
         self.days_critical = 0
         self.claimed_by: Truck | None = None
         self.state = "wandering"  # Initial state
+        self.model.beneficiary_stats.added()
 
     # Needs Thresholds
     COMFORT = 40  # "I'm fine"
     SURVIVAL = 60  # "I need help soon"
     CRITICAL = 90  # "Emergency"
 
+    # States in which trucks consider a beneficiary for aid
+    NEEDY_STATES = ("opportunistic", "seeking", "desperate")
+
+    _state = None
+    _claimed_by = None
+    _index_key = None
+    _water_urgency = 0
+    _food_urgency = 0
+    _is_critical = False
+
+    def _update_index(self):
+        """Keep the model's index of unclaimed needy beneficiaries in sync."""
+        index = self.model.beneficiary_index
+        key = index.key(self)
+        index.update(self, self._index_key, key)
+        self._index_key = key
+
+    @CellAgent.cell.setter
+    def cell(self, cell):
+        CellAgent.cell.fset(self, cell)
+        self._update_index()
+
+    @property
+    def state(self):
+        return self._state
+
+    @state.setter
+    def state(self, state):
+        self.model.beneficiary_stats.state_changed(self._state, state)
+        self._state = state
+        self._update_index()
+
+    @property
+    def water_urgency(self):
+        return self._water_urgency
+
+    @water_urgency.setter
+    def water_urgency(self, value):
+        self.model.beneficiary_stats.total_urgency += value - self._water_urgency
+        self._water_urgency = value
+
+    @property
+    def food_urgency(self):
+        return self._food_urgency
+
+    @food_urgency.setter
+    def food_urgency(self, value):
+        self.model.beneficiary_stats.total_urgency += value - self._food_urgency
+        self._food_urgency = value
+
+    @property
+    def is_critical(self):
+        return self._is_critical
+
+    @is_critical.setter
+    def is_critical(self, value):
+        self.model.beneficiary_stats.critical += value - self._is_critical
+        self._is_critical = value
+
+    @property
+    def claimed_by(self):
+        return self._claimed_by
+
+    @claimed_by.setter
+    def claimed_by(self, truck):
+        self._claimed_by = truck
+        self._update_index()
+
     def move_towards(self, target_pos):
         """
         Moves the agent one step closer to the target position.
@@ -146,41 +215,23 @@ class Beneficiary(CellAgent):
             # LOW NEED STATE: Wander / Normal Life
             self.wander()
 
+    def remove(self):
+        """Remove the beneficiary from the model and the running statistics."""
+        self.model.beneficiary_stats.removed(self)
+        super().remove()
+
     def wander(self):
         """Move randomly to simulate local activity"""
         self.cell = self.cell.neighborhood.select_random_cell()
 
     def find_nearest_truck(self, radius=None):
         """
-        Scans the neighborhood for a Truck agent.
+        Looks up the nearest Truck agent in the model's truck distance field.
         Returns the nearest Truck agent or None.
         Args:
             radius (int, optional): limit search to this distance. None = global.
         """
-        trucks = []
-
-        if radius is not None:
-            trucks = [
-                a
-                for a in self.cell.get_neighborhood(
-                    radius=radius, include_center=False
-                ).agents
-                if isinstance(a, Truck)
-            ]
-        else:
-            # Use global agent list for infinite range
-            trucks = [a for a in self.model.grid.agents if isinstance(a, Truck)]
-
-        if not trucks:
-            return None
-
-        # Helper to calculate Manhattan distance
-        def get_dist(t):
-            my_x, my_y = self.cell.coordinate
-            t_x, t_y = t.cell.coordinate
-            return abs(my_x - t_x) + abs(my_y - t_y)
-
-        return min(trucks, key=get_dist)
+        return self.model.truck_field.nearest_truck(self.cell.coordinate, radius)
 
 
 class Truck(CellAgent):
@@ -204,6 +255,12 @@ class Truck(CellAgent):
         self.delivery_rate = 10  # Max resources delivered per step
         self.target = None  # Current Beneficiary agent being targeted
 
+    @CellAgent.cell.setter
+    def cell(self, cell):
+        CellAgent.cell.fset(self, cell)
+        # Beneficiaries find trucks through the model's distance field
+        self.model.truck_field.moved(self)
+
     def distribute_aid(self, beneficiary, amount=10):
         """Split aid proportionally to need intensity"""
 
@@ -254,6 +311,25 @@ class Truck(CellAgent):
         x2, y2 = pos
         return abs(x1 - x2) + abs(y1 - y2)
 
+    def survival_score(self, beneficiary):
+        """
+        Score of a critical beneficiary.
+
+        Uses a score that considers BOTH urgency and distance
+        so we don't ignore a dying neighbor for a dying stranger far away.
+        """
+        dist = self.get_distance(beneficiary.cell.coordinate)
+        max_urgency = max(beneficiary.water_urgency, beneficiary.food_urgency)
+        # We square urgency so it remains the dominant factor,
+        # but distance still acts as a tie-breaker.
+        return (max_urgency**2) / (dist + 1)
+
+    def logistics_score(self, beneficiary):
+        """Score of a non-critical beneficiary: urgency per mile."""
+        dist = self.get_distance(beneficiary.cell.coordinate)
+        total_urgency = beneficiary.water_urgency + beneficiary.food_urgency
+        return total_urgency / (dist + 1)
+
     def step(self):
         """
         Advance the truck by one step.
@@ -287,49 +363,32 @@ class Truck(CellAgent):
 
         # 3. TARGET SELECTION
         if not self.target:
-            # Filter from global living agents
-            possible_victims = [
-                a
-                for a in self.model.grid.agents
-                if isinstance(a, Beneficiary)
-                and (a.claimed_by is None)
-                # Explicitly ignore comfort state
-                and a.state != "wandering"
-            ]
-
-            if possible_victims:
+            # Unclaimed beneficiaries that need help are indexed per state,
+            # so we only look at the ones that can actually become a target
+            index = self.model.beneficiary_index
+
+            if index.count(*Beneficiary.NEEDY_STATES):
                 # HYBRID TRIAGE LOGIC
                 # 1. SPLIT into Critical (Survival) and Non-Critical (Logistics)
-                critical_targets = [
-                    a for a in possible_victims if a.state == "desperate"
-                ]
-                non_critical_targets = [
-                    a for a in possible_victims if a.state != "desperate"
-                ]
-
-                if critical_targets:
+                if index.count("desperate"):
                     # TIER 1: SURVIVAL
                     # GOAL: SAVE MORE LIVES by satisfying the most urgent needs.
-                    # Use a score that considers BOTH urgency and distance
-                    # so we don't ignore a dying neighbor for a dying stranger far away.
-                    def survival_score(a):
-                        dist = self.get_distance(a.cell.coordinate)
-                        max_urgency = max(a.water_urgency, a.food_urgency)
-                        # We square urgency so it remains the dominant factor,
-                        # but distance still acts as a tie-breaker.
-                        return (max_urgency**2) / (dist + 1)
-
-                    self.target = max(critical_targets, key=survival_score)
-
-                elif non_critical_targets:
+                    self.target = index.best(
+                        ["desperate"],
+                        self.cell.coordinate,
+                        self.survival_score,
+                        max_urgency=100**2,
+                    )
+
+                else:
                     # TIER 2: LOGISTICS / EFFICIENCY
                     # Goal: Maximize value per mile.
-                    def logistics_score(a):
-                        dist = self.get_distance(a.cell.coordinate)
-                        total_urgency = a.water_urgency + a.food_urgency
-                        return total_urgency / (dist + 1)
-
-                    self.target = max(non_critical_targets, key=logistics_score)
+                    self.target = index.best(
+                        ["opportunistic", "seeking"],
+                        self.cell.coordinate,
+                        self.logistics_score,
+                        max_urgency=100 + 100,
+                    )
 
                 # Assign target if found
                 if self.target:
@@ -1,7 +1,11 @@
+from functools import partial
+
 import mesa
 from mesa.discrete_space import OrthogonalMooreGrid
 
 from .agents import Beneficiary, Truck
+from .spatial import BeneficiaryIndex, TruckDistanceField
+from .stats import BeneficiaryStats
 
 
 class HumanitarianModel(mesa.Model):
@@ -27,6 +31,7 @@ class HumanitarianModel(mesa.Model):
         height=20,
         rng=None,
         critical_days_threshold=5,
+        collect_state_histogram=False,
     ):
         """
         Create a new Humanitarian model with the given parameters.
@@ -38,6 +43,8 @@ class HumanitarianModel(mesa.Model):
             height (int): Height of the grid.
             rng (int, optional): Random seed for reproducibility.
             critical_days_threshold (int): Days before death when critical.
+            collect_state_histogram (bool): Also collect the number of
+                beneficiaries in each state every step.
         """
         super().__init__(rng=rng)
 
@@ -54,18 +61,33 @@ class HumanitarianModel(mesa.Model):
         self.grid.create_property_layer("is_depot", default_value=False, dtype=bool)
         self.grid[(0, 0)].is_depot = True  # Set the depot location
 
-        # 3. Create Agents
+        # 3. Index of unclaimed beneficiaries in need, used by trucks for triage
+        self.beneficiary_index = BeneficiaryIndex(
+            width, height, Beneficiary.NEEDY_STATES
+        )
+
+        # Distance to the nearest truck, used by beneficiaries seeking help
+        self.truck_field = TruckDistanceField(width, height)
+
+        # Running statistics, kept up to date by the beneficiaries themselves
+        self.beneficiary_stats = BeneficiaryStats()
+
+        # 4. Create Agents
         self.create_agents()
 
-        # 4. Setup Data Collection
-        # We use model.grid.agents to ensure we only count active agents
-        self.datacollector = mesa.DataCollector(
-            model_reporters={
-                "Avg Urgency": self.get_average_urgency,
-                "Deaths": self.get_total_deaths,
-                "Critical Count": self.get_critical_count,
-            }
-        )
+        # 5. Setup Data Collection
+        # All reporters read the running statistics, so collecting is O(1)
+        model_reporters = {
+            "Avg Urgency": self.get_average_urgency,
+            "Deaths": self.get_total_deaths,
+            "Critical Count": self.get_critical_count,
+        }
+        if collect_state_histogram:
+            for state in ("wandering", *Beneficiary.NEEDY_STATES):
+                model_reporters[state.capitalize()] = partial(
+                    self.get_state_count, state=state
+                )
+        self.datacollector = mesa.DataCollector(model_reporters=model_reporters)
         self.running = True
 
     def create_agents(self):
@@ -90,15 +112,18 @@ class HumanitarianModel(mesa.Model):
             n=self.num_trucks,
             cell=depot_cell,
         )
+        self.truck_field.update()
 
     def step(self):
         """
         Advance the model by one step.
 
         Lifecycle:
-        1. Collect Data: Record current model stats (e.g. Average Urgency).
+        1. Update the truck distance field if any truck moved.
         2. Agent Steps: Activate all agents in random order.
+        3. Collect Data: Record current model stats (e.g. Average Urgency).
         """
+        self.truck_field.update()
         self.agents.shuffle_do("step")
         self.datacollector.collect(self)
 
@@ -113,24 +138,20 @@ class HumanitarianModel(mesa.Model):
         Returns:
             float: The average urgency (water + food) or 0 if no beneficiaries.
         """
-        beneficiaries = [a for a in model.grid.agents if isinstance(a, Beneficiary)]
-        if not beneficiaries:
-            return 0
-        total = sum(a.water_urgency + a.food_urgency for a in beneficiaries)
-        return total / len(beneficiaries)
+        return model.beneficiary_stats.average_urgency
 
     @staticmethod
     def get_total_deaths(model):
         """Measures System Failure (Cumulative)"""
-        current_count = len(
-            [a for a in model.grid.agents if isinstance(a, Beneficiary)]
-        )
-        return model.num_beneficiaries - current_count
+        return model.beneficiary_stats.deaths
 
     @staticmethod
     def get_critical_count(model):
         """Measures Immediate Danger"""
         # Adapted to use is_critical flag since state is 'seeking' or 'wandering'
-        return sum(
-            1 for a in model.grid.agents if isinstance(a, Beneficiary) and a.is_critical
-        )
+        return model.beneficiary_stats.critical
+
+    @staticmethod
+    def get_state_count(model, state):
+        """Number of living beneficiaries in the given state"""
+        return model.beneficiary_stats.state_counts.get(state, 0)
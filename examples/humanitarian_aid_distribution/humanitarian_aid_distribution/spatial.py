@@ -0,0 +1,204 @@
+"""Spatial indexes that keep truck decisions independent of the population size."""
+
+import math
+
+import numpy as np
+
+
+class BeneficiaryIndex:
+    """
+    Buckets of unclaimed beneficiaries that need help, per state.
+
+    Every bucket is split into square bins of `bin_size` x `bin_size` cells, so
+    a truck can search outwards from its own bin and stop as soon as no bin
+    further away can beat the best score found so far.
+
+    Beneficiaries keep themselves in sync through their `state`, `claimed_by`
+    and `cell` setters, the index never scans the population.
+
+    Args:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        states (iterable): States that are indexed, other states are ignored.
+        bin_size (int): Width and height of a bin in cells.
+    """
+
+    def __init__(self, width, height, states, bin_size=8):
+        self.bin_size = bin_size
+        self.n_bins = (math.ceil(width / bin_size), math.ceil(height / bin_size))
+        # state -> bin -> dict used as an insertion ordered set of beneficiaries
+        self.buckets = {state: {} for state in states}
+        self.counts = dict.fromkeys(states, 0)
+
+    def key(self, beneficiary):
+        """Return the (state, bin) a beneficiary belongs to, or None."""
+        if (
+            beneficiary.state not in self.buckets
+            or beneficiary.claimed_by is not None
+            or beneficiary.cell is None
+        ):
+            return None
+        x, y = beneficiary.cell.coordinate
+        return beneficiary.state, (x // self.bin_size, y // self.bin_size)
+
+    def update(self, beneficiary, old_key, new_key):
+        """Move a beneficiary from old_key to new_key, either may be None."""
+        if old_key == new_key:
+            return
+        if old_key is not None:
+            state, bin_ = old_key
+            del self.buckets[state][bin_][beneficiary]
+            self.counts[state] -= 1
+        if new_key is not None:
+            state, bin_ = new_key
+            self.buckets[state].setdefault(bin_, {})[beneficiary] = None
+            self.counts[state] += 1
+
+    def count(self, *states):
+        """Return the number of unclaimed beneficiaries in the given states."""
+        return sum(self.counts[state] for state in states)
+
+    def _ring(self, center, radius):
+        """Yield the bins at Chebyshev distance radius from center."""
+        cx, cy = center
+        nx, ny = self.n_bins
+        if radius == 0:
+            bins = [center]
+        else:
+            bins = [
+                (cx + dx, cy + dy)
+                for dx in range(-radius, radius + 1)
+                for dy in (-radius, radius)
+            ]
+            bins += [
+                (cx + dx, cy + dy)
+                for dx in (-radius, radius)
+                for dy in range(-radius + 1, radius)
+            ]
+        for bx, by in bins:
+            if 0 <= bx < nx and 0 <= by < ny:
+                yield bx, by
+
+    def best(self, states, origin, score, max_urgency):
+        """
+        Return the beneficiary in states with the highest score, or None.
+
+        Args:
+            states (iterable): States to search.
+            origin (tuple): Coordinate the search starts from.
+            score (callable): Score of a beneficiary, of the form
+                urgency / (distance + 1) where distance is the Manhattan
+                distance to origin.
+            max_urgency (float): Upper bound of the urgency term of score,
+                used to stop searching once no further bin can do better.
+        """
+        if not self.count(*states):
+            return None
+
+        x, y = origin
+        center = (x // self.bin_size, y // self.bin_size)
+        nx, ny = self.n_bins
+        max_radius = max(center[0], nx - 1 - center[0], center[1], ny - 1 - center[1])
+
+        best, best_score = None, -math.inf
+        for radius in range(max_radius + 1):
+            # every cell in this ring is at least this far from origin
+            min_distance = (radius - 1) * self.bin_size + 1 if radius else 0
+            if max_urgency / (min_distance + 1) <= best_score:
+                break
+            for bin_ in self._ring(center, radius):
+                for state in states:
+                    for beneficiary in self.buckets[state].get(bin_, ()):
+                        beneficiary_score = score(beneficiary)
+                        if beneficiary_score > best_score:
+                            best, best_score = beneficiary, beneficiary_score
+        return best
+
+
+class TruckDistanceField:
+    """
+    Manhattan distance to the nearest truck, and which truck that is, per cell.
+
+    The field is computed for all trucks at once and only recomputed when a
+    truck has moved since the last update, so finding the nearest truck is an
+    array read instead of a scan over all agents. The model updates the field
+    once at the start of every step, so beneficiaries look for trucks where
+    they were when the step started.
+
+    Args:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+    """
+
+    def __init__(self, width, height):
+        self.xs = np.arange(width)[:, np.newaxis]
+        self.ys = np.arange(height)[np.newaxis, :]
+        self.distance = np.full((width, height), np.iinfo(np.int64).max)
+        self.nearest = np.full((width, height), -1)
+        # trucks known to the field, a dict used as an insertion ordered set
+        self.trucks = {}
+        # trucks and their coordinates as of the last update
+        self.snapshot = []
+        self.stale = True
+
+    def moved(self, truck):
+        """Register that a truck has moved, was created or was removed."""
+        if truck.cell is None:
+            self.trucks.pop(truck, None)
+        else:
+            self.trucks[truck] = None
+        self.stale = True
+
+    def update(self):
+        """Recompute the field if any truck has moved since the last update."""
+        if not self.stale:
+            return
+        self.snapshot = [(truck, truck.cell.coordinate) for truck in self.trucks]
+        self.distance.fill(np.iinfo(np.int64).max)
+        self.nearest.fill(-1)
+        seen = set()
+        for i, (_, (x, y)) in enumerate(self.snapshot):
+            # trucks often share a cell (e.g. at the depot), one pass is enough
+            if (x, y) in seen:
+                continue
+            seen.add((x, y))
+            distance = np.abs(self.xs - x) + np.abs(self.ys - y)
+            closer = distance < self.distance
+            self.distance[closer] = distance[closer]
+            self.nearest[closer] = i
+        self.stale = False
+
+    def nearest_truck(self, coordinate, radius=None):
+        """
+        Return the truck nearest to coordinate, or None.
+
+        Args:
+            coordinate (tuple): Coordinate to search from.
+            radius (int, optional): Only consider trucks within this Moore
+                radius, excluding coordinate itself. None = global.
+        """
+        i = self.nearest[coordinate]
+        if i < 0:
+            return None
+        if radius is None:
+            return self.snapshot[i][0]
+
+        distance = self.distance[coordinate]
+        if 0 < distance <= radius:
+            # the nearest truck overall is within the neighborhood
+            return self.snapshot[i][0]
+        if distance > 2 * radius:
+            # no truck can be within the neighborhood
+            return None
+
+        # the nearest truck is on this cell or just outside the neighborhood
+        # while another one may be in a corner of it, check them one by one
+        x, y = coordinate
+        in_range = [
+            (abs(x - t_x) + abs(y - t_y), truck)
+            for truck, (t_x, t_y) in self.snapshot
+            if 0 < max(abs(x - t_x), abs(y - t_y)) <= radius
+        ]
+        if not in_range:
+            return None
+        return min(in_range, key=lambda item: item[0])[1]
@@ -0,0 +1,51 @@
+"""Running statistics of the beneficiary population."""
+
+
+class BeneficiaryStats:
+    """
+    Running sums and counts over all living beneficiaries.
+
+    Beneficiaries report every change of their urgency, critical flag and
+    state, and their removal, so the model reporters can read the current
+    values instead of scanning all agents on every step.
+
+    Attributes:
+        alive (int): Number of living beneficiaries.
+        deaths (int): Number of beneficiaries that died.
+        total_urgency (float): Sum of water and food urgency of the living.
+        critical (int): Number of living beneficiaries flagged critical.
+        state_counts (dict): Number of living beneficiaries per state.
+    """
+
+    def __init__(self):
+        self.alive = 0
+        self.deaths = 0
+        self.total_urgency = 0.0
+        self.critical = 0
+        self.state_counts = {}
+
+    def state_changed(self, old, new):
+        """Move one beneficiary from state old to state new, either may be None."""
+        if old is not None:
+            self.state_counts[old] -= 1
+        if new is not None:
+            self.state_counts[new] = self.state_counts.get(new, 0) + 1
+
+    def added(self):
+        """Count a new beneficiary, its values are reported by its setters."""
+        self.alive += 1
+
+    def removed(self, beneficiary):
+        """Take a dead beneficiary out of all sums and counts."""
+        self.alive -= 1
+        self.deaths += 1
+        self.total_urgency -= beneficiary.water_urgency + beneficiary.food_urgency
+        self.critical -= beneficiary.is_critical
+        self.state_changed(beneficiary.state, None)
+
+    @property
+    def average_urgency(self):
+        """Average of water + food urgency over the living, or 0."""
+        if not self.alive:
+            return 0
+        return self.total_urgency / self.alive
@@ -36,39 +36,60 @@ class Server(Agent):
 
     Server-centric design: after completing service, the server
     checks the queue and pulls the next customer itself.
+
+    Customers are Customer agents, or in record mode their arrival time.
+    Service times are drawn from the model's service time stream, of which
+    service_time is the distribution.
     """
 
-    def __init__(self, model, service_rate):
+    def __init__(self, model, service_time):
         super().__init__(model)
-        self.service_rate = service_rate
+        self.service_time = service_time
         self.current_customer = None
         self.busy_time = 0.0
         self._service_started_at = None
 
+    @property
+    def service_rate(self):
+        """Mean number of services per unit of time (μ)."""
+        return 1.0 / self.service_time.mean
+
     @property
     def is_idle(self):
         return self.current_customer is None
 
     def start_service(self, customer):
         """Begin serving a customer."""
-        customer.service_start_time = self.model.time
+        if self.is_idle:
+            self.model._server_busy(+1)
+        if isinstance(customer, Customer):
+            customer.service_start_time = self.model.time
         self.current_customer = customer
         self._service_started_at = self.model.time
 
-        duration = self.model.rng.exponential(1.0 / self.service_rate)
+        duration = self.model.service_times()
         self.model.schedule_event(self._complete_service, after=duration)
 
     def _complete_service(self):
         """Complete service and try to pull next customer from queue."""
         customer = self.current_customer
-        customer.service_end_time = self.model.time
         self.busy_time += self.model.time - self._service_started_at
 
-        self.model._record_departure(customer)
-        customer.remove()
+        if isinstance(customer, Customer):
+            customer.service_end_time = self.model.time
+            arrival_time = customer.arrival_time
+            customer.remove()
+        else:
+            arrival_time = customer
+        self.model._record_departure(
+            self._service_started_at - arrival_time, self.model.time - arrival_time
+        )
 
         # Server-centric: actively pull from queue
-        self.current_customer = None
-        self._service_started_at = None
-        if self.model.queue:
-            self.start_service(self.model.queue.popleft())
+        next_customer = self.model._next_customer()
+        if next_customer is None:
+            self.current_customer = None
+            self._service_started_at = None
+            self.model._server_busy(-1)
+        else:
+            self.start_service(next_customer)
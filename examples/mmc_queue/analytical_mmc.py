@@ -1,5 +1,9 @@
+import warnings
 from math import factorial
 
+import numpy as np
+from scipy import sparse
+
 
 def analytical_mmc(arrival_rate, service_rate, c):
     """Compute analytical M/M/c steady-state metrics using the Erlang C formula.
@@ -27,3 +31,71 @@ def analytical_mmc(arrival_rate, service_rate, c):
         "avg_queue_length": erlang_c * rho / (1 - rho),
         "prob_queuing": erlang_c,
     }
+
+
+def analytical_jackson(arrival_rates, service_rates, n_servers, routing):
+    """Compute analytical steady-state metrics of an open Jackson network.
+
+    By Jackson's theorem the stations behave as independent M/M/c queues
+    (product form), each with the total arrival rate λ that solves the
+    traffic equations λ = λ0 + Pᵀλ.
+
+    Args:
+        arrival_rates: External arrival rate λ0 of every station.
+        service_rates: Service rate μ of a server of every station.
+        n_servers: Number of servers c of every station.
+        routing: Routing matrix P, P[i, j] is the probability that a customer
+            goes to station j after station i, dense or scipy.sparse. The remaining probability of a
+            row is the probability of leaving the network.
+
+    Returns:
+        dict with an array of every metric per station, and the avg_sojourn_time
+        in the network, or None if any station is unstable (rho >= 1), which
+        includes networks that customers never leave.
+
+    Raises:
+        ValueError: If the rows of routing are not probabilities that add up
+            to at most 1.
+    """
+    arrival_rates = np.asarray(arrival_rates, dtype=float)
+    n = len(arrival_rates)
+    if sparse.issparse(routing):
+        routing = sparse.csr_array(routing, dtype=float)
+        probabilities, row_sums = routing.data, routing.sum(axis=1)
+    else:
+        routing = np.asarray(routing, dtype=float)
+        probabilities, row_sums = routing, routing.sum(axis=1)
+    if (probabilities < 0).any() or (row_sums > 1 + 1e-9).any():
+        raise ValueError(
+            "The rows of routing must be probabilities adding up to at most 1."
+        )
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", sparse.linalg.MatrixRankWarning)
+            if sparse.issparse(routing):
+                system = sparse.eye_array(n, format="csc") - routing.T.tocsc()
+                throughput = sparse.linalg.spsolve(system, arrival_rates)
+            else:
+                throughput = np.linalg.solve(np.eye(n) - routing.T, arrival_rates)
+    except (np.linalg.LinAlgError, sparse.linalg.MatrixRankWarning):
+        return None  # customers stay in the network forever
+
+    stations = [
+        analytical_mmc(rate, service_rate, c)
+        for rate, service_rate, c in zip(throughput, service_rates, n_servers)
+    ]
+    if any(station is None for station in stations):
+        return None
+
+    metrics = {
+        metric: np.array([station[metric] for station in stations])
+        for metric in ("utilization", "avg_wait_time", "avg_system_time")
+    }
+    avg_number = throughput * metrics["avg_system_time"]  # Little's law
+    return {
+        "throughput": throughput,
+        **metrics,
+        "avg_number": avg_number,
+        "avg_sojourn_time": avg_number.sum() / arrival_rates.sum(),
+    }
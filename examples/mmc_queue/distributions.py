@@ -0,0 +1,121 @@
+"""Inter-arrival and service time distributions, drawn in blocks.
+
+Drawing one variate per event pays the overhead of a NumPy call for a
+single number. A VariateStream draws a block of variates at once and hands
+them out one by one, so the queue can run any distribution at close to the
+cost of reading from a list. Any distribution with a `sample(rng, size)`
+method can be used, which turns the M/M/c queue into a G/G/c queue.
+"""
+
+import math
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class Distribution(ABC):
+    """A distribution of positive times, with a known mean."""
+
+    mean: float
+
+    @abstractmethod
+    def sample(self, rng, size):
+        """Return an array of size variates drawn with rng."""
+
+
+class Exponential(Distribution):
+    """Exponential distribution with the given rate (M)."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.mean = 1.0 / rate
+
+    def sample(self, rng, size):
+        return rng.exponential(self.mean, size)
+
+
+class Erlang(Distribution):
+    """Sum of k exponential phases with the given total rate (E_k).
+
+    The mean is 1 / rate for any k, the variation decreases with k.
+    """
+
+    def __init__(self, k, rate):
+        self.k = k
+        self.rate = rate
+        self.mean = 1.0 / rate
+
+    def sample(self, rng, size):
+        return rng.gamma(self.k, self.mean / self.k, size)
+
+
+class Lognormal(Distribution):
+    """Lognormal distribution with the given mean and coefficient of variation."""
+
+    def __init__(self, mean, cv):
+        self.mean = mean
+        self.cv = cv
+        self._sigma = math.sqrt(math.log(1 + cv**2))
+        self._mu = math.log(mean) - self._sigma**2 / 2
+
+    def sample(self, rng, size):
+        return rng.lognormal(self._mu, self._sigma, size)
+
+
+class Deterministic(Distribution):
+    """Always the same time (D)."""
+
+    def __init__(self, value):
+        self.mean = value
+
+    def sample(self, rng, size):
+        return np.full(size, self.mean)
+
+
+class Empirical(Distribution):
+    """Resamples observed times, e.g. from measurements of a real system."""
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+        self.mean = float(self.values.mean())
+
+    def sample(self, rng, size):
+        return rng.choice(self.values, size)
+
+
+class Uniform(Distribution):
+    """Uniform distribution between low and high, e.g. for routing decisions."""
+
+    def __init__(self, low=0.0, high=1.0):
+        self.low = low
+        self.high = high
+        self.mean = (low + high) / 2
+
+    def sample(self, rng, size):
+        return rng.uniform(self.low, self.high, size)
+
+
+class VariateStream:
+    """Hands out variates of a distribution one at a time, drawn in blocks.
+
+    Args:
+        distribution: The Distribution to draw from.
+        rng: NumPy random Generator of this stream.
+        block_size: Number of variates drawn at once.
+    """
+
+    def __init__(self, distribution, rng, block_size=4096):
+        self.distribution = distribution
+        self.rng = rng
+        self.block_size = block_size
+        self._block = []
+        self._index = 0
+
+    def __call__(self):
+        """Return the next variate."""
+        if self._index == len(self._block):
+            self._block = self.distribution.sample(self.rng, self.block_size).tolist()
+            self._index = 0
+        value = self._block[self._index]
+        self._index += 1
+        return value
@@ -0,0 +1,109 @@
+"""Streaming estimators for long queue simulations.
+
+All estimators use constant memory, however many observations they get, so
+steady-state runs can be as long as needed.
+"""
+
+import math
+
+from scipy import stats
+
+
+class Welford:
+    """Running mean and variance of a series of observations (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        """Add an observation."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        """Sample variance of the observations, or 0 for fewer than 2."""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+
+class TimeWeighted:
+    """Time average of a piecewise constant value, such as a queue length."""
+
+    def __init__(self, time=0.0, value=0):
+        self.reset(time, value)
+
+    def reset(self, time, value=None):
+        """Start averaging again from time, keeping the current value by default."""
+        if value is not None:
+            self.value = value
+        self.start = time
+        self._last_time = time
+        self._area = 0.0
+
+    def update(self, time, value):
+        """Record that the value changed to value at time."""
+        self._area += self.value * (time - self._last_time)
+        self._last_time = time
+        self.value = value
+
+    def mean(self, time):
+        """Return the time average up to time."""
+        if time <= self.start:
+            return float(self.value)
+        area = self._area + self.value * (time - self._last_time)
+        return area / (time - self.start)
+
+
+class BatchMeans:
+    """Batch means of a correlated series of observations, for confidence intervals.
+
+    Observations are grouped into consecutive batches, whose means are close
+    to independent if batches are long enough. Whenever there are 2 * batches
+    batch means, neighbouring batches are merged and the batch size doubles,
+    so memory stays constant and batches grow with the length of the run.
+
+    Args:
+        batches: Minimum number of batches once there are enough observations.
+    """
+
+    def __init__(self, batches=20):
+        self.batches = batches
+        self.batch_size = 1
+        self.means = []
+        self._sum = 0.0
+        self._count = 0
+
+    def add(self, value):
+        """Add an observation."""
+        self._sum += value
+        self._count += 1
+        if self._count == self.batch_size:
+            self.means.append(self._sum / self._count)
+            self._sum = 0.0
+            self._count = 0
+            if len(self.means) == 2 * self.batches:
+                self.means = [
+                    (a + b) / 2 for a, b in zip(self.means[::2], self.means[1::2])
+                ]
+                self.batch_size *= 2
+
+    def confidence_interval(self, confidence=0.95):
+        """Return mean and half-width of the confidence interval of the mean.
+
+        Only complete batches are used, the half-width is inf for fewer than 2.
+        """
+        n = len(self.means)
+        if n == 0:
+            return math.nan, math.inf
+        mean = sum(self.means) / n
+        if n < 2:
+            return mean, math.inf
+        variance = sum((m - mean) ** 2 for m in self.means) / (n - 1)
+        t = stats.t.ppf((1 + confidence) / 2, n - 1)
+        return mean, float(t * math.sqrt(variance / n))
@@ -2,6 +2,13 @@
 
 Demonstrates schedule_recurring (arrivals), schedule_event (service),
 and run_until — no step() needed.
+
+In record mode customers are not agents but just their arrival time, so
+runs of millions of customers are not slowed down by creating and removing
+an agent for each of them.
+
+Inter-arrival and service times can follow any distribution from
+distributions.py, which makes the same model a G/G/c queue.
 """
 
 from collections import deque
@@ -12,8 +19,12 @@ from mesa.time import Schedule
 
 try:
     from .agents import Customer, Server
+    from .distributions import Distribution, Exponential, VariateStream
+    from .estimators import BatchMeans, TimeWeighted, Welford
 except ImportError:
     from agents import Customer, Server
+    from distributions import Distribution, Exponential, VariateStream
+    from estimators import BatchMeans, TimeWeighted, Welford
 
 
 class MMcScenario(Scenario):
@@ -22,13 +33,21 @@ class MMcScenario(Scenario):
     arrival_rate: float = 1.0
     service_rate: float = 0.5
     n_servers: int = 2
+    record_mode: bool = False
+    warmup_time: float = 0.0
+    interarrival_time: Distribution | None = None
+    service_time: Distribution | None = None
 
 
 class MMcQueue(Model):
     """M/M/c queuing system.
 
     Args:
-        scenario: MMcScenario with arrival_rate (λ), service_rate (μ), n_servers (c).
+        scenario: MMcScenario with arrival_rate (λ), service_rate (μ), n_servers (c),
+            record_mode (customers are arrival times instead of agents),
+            warmup_time (statistics only count from this time on), and
+            interarrival_time and service_time (Distributions that replace the
+            exponential ones given by arrival_rate and service_rate).
         rng: Random number generator seed.
     """
 
@@ -46,27 +65,48 @@ class MMcQueue(Model):
         self.total_wait_time = 0.0
         self.total_system_time = 0.0
 
+        # Steady-state statistics, from the end of the warm-up on
+        self.busy_servers = 0
+        self.wait_time_stats = Welford()
+        self.system_time_stats = Welford()
+        self.wait_time_batches = BatchMeans()
+        self.queue_length_stats = TimeWeighted()
+        self.busy_servers_stats = TimeWeighted()
+
+        # Variate streams, each with its own random number generator
+        arrival_rng, service_rng = self.rng.spawn(2)
+        service_time = self.scenario.service_time or Exponential(
+            self.scenario.service_rate
+        )
+        self.interarrival_times = VariateStream(
+            self.scenario.interarrival_time or Exponential(self.scenario.arrival_rate),
+            arrival_rng,
+        )
+        self.service_times = VariateStream(service_time, service_rng)
+
         # Create servers
         self.servers = [
-            Server(self, self.scenario.service_rate)
-            for _ in range(self.scenario.n_servers)
+            Server(self, service_time) for _ in range(self.scenario.n_servers)
         ]
 
         # Disable default step schedule — pure DES
         self._default_schedule.stop()
 
+        if self.scenario.warmup_time > 0:
+            self.schedule_event(self._end_warmup, at=self.scenario.warmup_time)
+
         # Schedule stochastic arrivals
         self.schedule_recurring(
             self._customer_arrival,
             Schedule(
-                interval=lambda m: m.rng.exponential(1.0 / m.scenario.arrival_rate),
+                interval=lambda m: m.interarrival_times(),
                 start=0.0,
             ),
         )
 
     def _customer_arrival(self):
         """Handle a customer arrival."""
-        customer = Customer(self)
+        customer = self.time if self.scenario.record_mode else Customer(self)
 
         for server in self.servers:
             if server.is_idle:
@@ -74,39 +114,65 @@ class MMcQueue(Model):
                 return
 
         self.queue.append(customer)
-
-    def _record_departure(self, customer):
+        self.queue_length_stats.update(self.time, len(self.queue))
+
+    def _next_customer(self):
+        """Take the next customer from the queue, or return None."""
+        if not self.queue:
+            return None
+        customer = self.queue.popleft()
+        self.queue_length_stats.update(self.time, len(self.queue))
+        return customer
+
+    def _server_busy(self, change):
+        """Record that change (+1 or -1) servers became busy."""
+        self.busy_servers += change
+        self.busy_servers_stats.update(self.time, self.busy_servers)
+
+    def _record_departure(self, wait_time, system_time):
         """Record metrics for a departing customer."""
         self.customers_served += 1
-        self.total_wait_time += customer.wait_time
-        self.total_system_time += customer.system_time
+        self.total_wait_time += wait_time
+        self.total_system_time += system_time
+
+        self.wait_time_stats.add(wait_time)
+        self.system_time_stats.add(system_time)
+        self.wait_time_batches.add(wait_time)
+
+    def _end_warmup(self):
+        """Forget the statistics of the warm-up, to only measure the steady state."""
+        self.wait_time_stats = Welford()
+        self.system_time_stats = Welford()
+        self.wait_time_batches = BatchMeans()
+        self.queue_length_stats.reset(self.time)
+        self.busy_servers_stats.reset(self.time)
 
     # --- Metrics ---
 
     @property
     def avg_wait_time(self):
-        if self.customers_served == 0:
-            return 0.0
-        return self.total_wait_time / self.customers_served
+        return self.wait_time_stats.mean
 
     @property
     def avg_system_time(self):
-        if self.customers_served == 0:
-            return 0.0
-        return self.total_system_time / self.customers_served
+        return self.system_time_stats.mean
 
     @property
     def server_utilization(self):
-        if self.time == 0:
-            return 0.0
-        return sum(s.busy_time for s in self.servers) / (
-            self.scenario.n_servers * self.time
-        )
+        return self.busy_servers_stats.mean(self.time) / self.scenario.n_servers
+
+    @property
+    def avg_queue_length(self):
+        return self.queue_length_stats.mean(self.time)
 
     @property
     def current_queue_length(self):
         return len(self.queue)
 
+    def wait_time_interval(self, confidence=0.95):
+        """Batch means confidence interval (mean, half-width) of the wait time."""
+        return self.wait_time_batches.confidence_interval(confidence)
+
 
 if __name__ == "__main__":
     try:
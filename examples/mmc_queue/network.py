@@ -0,0 +1,352 @@
+"""Open Jackson network: M/M/c stations connected by routing probabilities.
+
+Customers arrive at the stations from outside, are served, and then move on
+to another station or leave the network, with the probabilities of a routing
+matrix. All stations share the event calendar of the model, and the state of
+the network is kept in one list per quantity, indexed by station, rather than
+in an agent per station or customer, so networks of thousands of stations
+run at the speed of the event calendar.
+
+Like in MMcQueue, servers pull: when a server of a station completes a
+service, it takes the next customer from the queue of its own station.
+"""
+
+from bisect import bisect_right
+from collections import deque
+from functools import partial
+from heapq import heappop, heappush
+
+import numpy as np
+from mesa import Model
+from mesa.experimental.scenarios import Scenario
+from mesa.time import Schedule
+from scipy import sparse
+
+try:
+    from .distributions import Exponential, Uniform, VariateStream
+    from .estimators import Welford
+except ImportError:
+    from distributions import Exponential, Uniform, VariateStream
+    from estimators import Welford
+
+
+class JacksonScenario(Scenario):
+    """Scenario for open Jackson network experiments.
+
+    The default is a network of 3 stations: customers enter at station 0,
+    go on to station 1 or 2, and a fifth of them return from station 2 to
+    station 0.
+    """
+
+    arrival_rates: tuple = (1.0, 0.0, 0.0)
+    service_rates: tuple = (1.5, 0.4, 0.6)
+    n_servers: tuple = (1, 2, 1)
+    routing: tuple = ((0.0, 0.5, 0.5), (0.0, 0.0, 0.0), (0.2, 0.0, 0.0))
+    warmup_time: float = 0.0
+
+
+class JacksonNetwork(Model):
+    """Open network of M/M/c stations.
+
+    Args:
+        scenario: JacksonScenario with arrival_rates (external λ of every
+            station), service_rates (μ of a server of every station),
+            n_servers (c of every station), routing (matrix, dense or
+            scipy.sparse, of the probability to go from station i to station j
+            after service, the rest of a row leaves the network) and
+            warmup_time (statistics only count from this time on).
+        rng: Random number generator seed.
+    """
+
+    def __init__(self, scenario=None, **kwargs):
+        if scenario is None:
+            scenario = JacksonScenario(**kwargs)
+            kwargs = {}
+        super().__init__(scenario=scenario, **kwargs)
+
+        self.service_rates = [float(rate) for rate in self.scenario.service_rates]
+        self.n_servers = [int(c) for c in self.scenario.n_servers]
+        self.n_stations = n = len(self.service_rates)
+
+        # Destinations of every station and their cumulative probabilities
+        routing = self.scenario.routing
+        if not sparse.issparse(routing):
+            routing = np.asarray(routing, dtype=float)
+        routing = sparse.csr_array(routing, dtype=float)
+        routing.eliminate_zeros()
+        self._destinations = []
+        self._cumulative = []
+        for station in range(n):
+            row = slice(routing.indptr[station], routing.indptr[station + 1])
+            self._destinations.append(routing.indices[row].tolist())
+            self._cumulative.append(np.cumsum(routing.data[row]).tolist())
+
+        # Stations with external arrivals, chosen for every arrival of the
+        # merged arrival process
+        arrival_rates = np.asarray(self.scenario.arrival_rates, dtype=float)
+        if not (arrival_rates > 0).any():
+            raise ValueError(
+                "An open network needs external arrivals at one station at least."
+            )
+        self._entries = np.flatnonzero(arrival_rates).tolist()
+        self._entry_cumulative = np.cumsum(arrival_rates[self._entries]).tolist()
+        self._entry_cumulative = [
+            p / self._entry_cumulative[-1] for p in self._entry_cumulative
+        ]
+
+        # Per-station state. A waiting customer is (arrival time at the
+        # station, entry time in the network), a customer in service is
+        # (completion time, arrival time, service start time, entry time).
+        self.queues = [deque() for _ in range(n)]
+        self.in_service = [[] for _ in range(n)]  # heaps by completion time
+        self.number = [0] * n  # customers at the station, waiting or in service
+
+        # Metrics
+        self.events = 0
+        self.customers_served = 0
+
+        # Per-station statistics, from the end of the warm-up on
+        self._start_time = 0.0
+        self._last_change = [0.0] * n
+        self._number_area = [0.0] * n
+        self._busy_area = [0.0] * n
+        self._served = [0] * n
+        self._total_wait_time = [0.0] * n
+        self._total_system_time = [0.0] * n
+        self.sojourn_time_stats = Welford()
+
+        # Variate streams, each with its own random number generator
+        arrival_rng, service_rng, routing_rng = self.rng.spawn(3)
+        self.interarrival_times = VariateStream(
+            Exponential(arrival_rates.sum()), arrival_rng
+        )
+        self.unit_service_times = VariateStream(Exponential(1.0), service_rng)
+        self.uniforms = VariateStream(Uniform(), routing_rng)
+
+        # One completion handler per station, so events need no arguments
+        self._completions = [partial(self._complete_service, i) for i in range(n)]
+
+        # Disable default step schedule — pure DES
+        self._default_schedule.stop()
+
+        if self.scenario.warmup_time > 0:
+            self.schedule_event(self._end_warmup, at=self.scenario.warmup_time)
+
+        # Schedule the merged external arrivals of all stations
+        self.schedule_recurring(
+            self._external_arrival,
+            Schedule(
+                interval=lambda m: m.interarrival_times(),
+                start=0.0,
+            ),
+        )
+
+    def _external_arrival(self):
+        """Handle a customer arriving from outside the network."""
+        self.events += 1
+        index = bisect_right(self._entry_cumulative, self.uniforms())
+        self._arrive(self._entries[index], self.time)
+
+    def _arrive(self, station, entry_time):
+        """Handle a customer arriving at a station."""
+        self._record_change(station)
+        self.number[station] += 1
+        if len(self.in_service[station]) < self.n_servers[station]:
+            self._start_service(station, self.time, entry_time)
+        else:
+            self.queues[station].append((self.time, entry_time))
+
+    def _start_service(self, station, arrival_time, entry_time):
+        """Begin serving a customer at a station."""
+        completion_time = (
+            self.time + self.unit_service_times() / self.service_rates[station]
+        )
+        heappush(
+            self.in_service[station],
+            (completion_time, arrival_time, self.time, entry_time),
+        )
+        self.schedule_event(self._completions[station], at=completion_time)
+
+    def _complete_service(self, station):
+        """Complete the first service of a station and route the customer on."""
+        self.events += 1
+        self._record_change(station)
+        _, arrival_time, start_time, entry_time = heappop(self.in_service[station])
+        self.number[station] -= 1
+        self._served[station] += 1
+        self._total_wait_time[station] += start_time - arrival_time
+        self._total_system_time[station] += self.time - arrival_time
+
+        # Server-centric: actively pull from the queue of the station
+        if self.queues[station]:
+            self._start_service(station, *self.queues[station].popleft())
+
+        index = bisect_right(self._cumulative[station], self.uniforms())
+        if index < len(self._destinations[station]):
+            self._arrive(self._destinations[station][index], entry_time)
+        else:
+            self.customers_served += 1
+            self.sojourn_time_stats.add(self.time - entry_time)
+
+    def _record_change(self, station):
+        """Add the time since the last change of a station to its averages."""
+        elapsed = self.time - self._last_change[station]
+        self._number_area[station] += self.number[station] * elapsed
+        self._busy_area[station] += len(self.in_service[station]) * elapsed
+        self._last_change[station] = self.time
+
+    def _end_warmup(self):
+        """Forget the statistics of the warm-up, to only measure the steady state."""
+        n = self.n_stations
+        self._start_time = self.time
+        self._last_change = [self.time] * n
+        self._number_area = [0.0] * n
+        self._busy_area = [0.0] * n
+        self._served = [0] * n
+        self._total_wait_time = [0.0] * n
+        self._total_system_time = [0.0] * n
+        self.sojourn_time_stats = Welford()
+
+    def _time_average(self, area, value):
+        """Return the time averages of a per-station value up to now."""
+        elapsed = self.time - np.array(self._last_change)
+        return (np.array(area) + np.array(value) * elapsed) / (
+            self.time - self._start_time
+        )
+
+    def _per_customer(self, total):
+        """Return a per-station total divided by the customers served there."""
+        served = np.array(self._served)
+        return np.divide(
+            total, served, out=np.full(self.n_stations, np.nan), where=served > 0
+        )
+
+    # --- Metrics, arrays with one value per station ---
+
+    @property
+    def throughput(self):
+        return np.array(self._served) / (self.time - self._start_time)
+
+    @property
+    def utilization(self):
+        busy = [len(customers) for customers in self.in_service]
+        return self._time_average(self._busy_area, busy) / np.array(self.n_servers)
+
+    @property
+    def avg_number(self):
+        return self._time_average(self._number_area, self.number)
+
+    @property
+    def avg_wait_time(self):
+        return self._per_customer(self._total_wait_time)
+
+    @property
+    def avg_system_time(self):
+        return self._per_customer(self._total_system_time)
+
+    @property
+    def avg_sojourn_time(self):
+        """Average time from entering to leaving the network."""
+        return self.sojourn_time_stats.mean
+
+
+def random_network(
+    n_stations,
+    degree=3,
+    exit_probability=0.2,
+    utilization=0.7,
+    max_servers=4,
+    rng=None,
+):
+    """Return the parameters of a random sparse Jackson network, e.g. for benchmarks.
+
+    Every station routes to degree random stations, and customers leave the
+    network after a service with exit_probability. Service rates are chosen so
+    that every station has the same utilization.
+
+    Returns:
+        dict of JacksonScenario parameters, with a scipy.sparse routing matrix.
+    """
+    rng = np.random.default_rng(rng)
+    rows = np.repeat(np.arange(n_stations), degree)
+    columns = np.concatenate(
+        [rng.choice(n_stations, degree, replace=False) for _ in range(n_stations)]
+    )
+    probabilities = rng.dirichlet(np.ones(degree), n_stations).ravel()
+    routing = sparse.csr_array(
+        (probabilities * (1 - exit_probability), (rows, columns)),
+        shape=(n_stations, n_stations),
+    )
+
+    arrival_rates = rng.uniform(0.0, 1.0, n_stations)
+    n_servers = rng.integers(1, max_servers + 1, n_stations)
+    throughput = sparse.linalg.spsolve(
+        sparse.eye_array(n_stations, format="csc") - routing.T.tocsc(), arrival_rates
+    )
+    return {
+        "arrival_rates": arrival_rates,
+        "service_rates": throughput / (n_servers * utilization),
+        "n_servers": n_servers,
+        "routing": routing,
+    }
+
+
+if __name__ == "__main__":
+    import time
+
+    try:
+        from .analytical_mmc import analytical_jackson
+    except ImportError:
+        from analytical_mmc import analytical_jackson
+
+    SIM_TIME = 100_000.0
+
+    scenario = JacksonScenario(warmup_time=SIM_TIME / 100, rng=42)
+    model = JacksonNetwork(scenario=scenario)
+    model.run_until(SIM_TIME)
+    analytical = analytical_jackson(
+        scenario.arrival_rates,
+        scenario.service_rates,
+        scenario.n_servers,
+        scenario.routing,
+    )
+
+    print(f"Jackson network of {model.n_stations} stations (T={SIM_TIME})")
+    print(f"Customers served: {model.customers_served}\n")
+    print(f"{'Station':<8} {'Metric':<18} {'Simulated':>12} {'Analytical':>12}")
+    print("-" * 52)
+    for station in range(model.n_stations):
+        for name, metric in [
+            ("Throughput", "throughput"),
+            ("Utilization", "utilization"),
+            ("Avg number", "avg_number"),
+            ("Avg wait time", "avg_wait_time"),
+        ]:
+            print(
+                f"{station:<8} {name:<18} {getattr(model, metric)[station]:>12.4f} {analytical[metric][station]:>12.4f}"
+            )
+    print(
+        f"{'All':<8} {'Avg sojourn time':<18} {model.avg_sojourn_time:>12.4f} {analytical['avg_sojourn_time']:>12.4f}"
+    )
+
+    # A large random network, to measure the speed of the engine
+    N_STATIONS = 1000
+    LARGE_SIM_TIME = 1000.0
+
+    params = random_network(N_STATIONS, rng=42)
+    model = JacksonNetwork(
+        scenario=JacksonScenario(**params, warmup_time=100.0, rng=42)
+    )
+    start = time.perf_counter()
+    model.run_until(LARGE_SIM_TIME)
+    elapsed = time.perf_counter() - start
+    analytical = analytical_jackson(**params)
+    error = np.abs(model.avg_number / analytical["avg_number"] - 1)
+
+    print(f"\nRandom Jackson network of {N_STATIONS} stations (T={LARGE_SIM_TIME})")
+    print(f"Events: {model.events} in {elapsed:.1f} s")
+    print(f"Events per minute: {60 * model.events / elapsed:,.0f}")
+    print(f"Median relative error of avg number: {np.median(error):.4f}")
+    print(
+        f"Avg sojourn time: {model.avg_sojourn_time:.4f} simulated, {analytical['avg_sojourn_time']:.4f} analytical"
+    )
@@ -0,0 +1,139 @@
+"""Independent replications of the M/M/c queue, run in a process pool.
+
+A single run of the queue gives a point estimate with an unknown error.
+Running independent replications, each with its own seed, gives a sample of
+estimates from which a confidence interval follows. Replications are added
+in batches of a fixed size, until the confidence interval of every metric is
+narrower than the target half-width.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+try:
+    from .model import MMcQueue, MMcScenario
+except ImportError:
+    from model import MMcQueue, MMcScenario
+
+METRICS = ("avg_wait_time", "avg_system_time", "server_utilization")
+
+
+def replication_seed(seed, replication):
+    """Return the seed of a replication, independent of how runs are batched."""
+    return int(np.random.SeedSequence([seed, replication]).generate_state(1)[0])
+
+
+def run_replication(params, seed, sim_time):
+    """Run a single replication and return its metrics."""
+    model = MMcQueue(scenario=MMcScenario(**params, rng=seed))
+    model.run_until(sim_time)
+    return {"seed": seed} | {metric: getattr(model, metric) for metric in METRICS}
+
+
+def summarize(results, confidence=0.95):
+    """Return mean and confidence interval of every metric over replications.
+
+    Args:
+        results: DataFrame with one row per replication.
+        confidence: Confidence level of the intervals.
+
+    Returns:
+        DataFrame indexed by metric, with mean, half_width, lower and upper.
+    """
+    n = len(results)
+    mean = results[list(METRICS)].mean()
+    if n < 2:
+        half_width = pd.Series(math.inf, index=mean.index)
+    else:
+        t = stats.t.ppf((1 + confidence) / 2, n - 1)
+        half_width = t * results[list(METRICS)].std(ddof=1) / math.sqrt(n)
+    return pd.DataFrame(
+        {
+            "mean": mean,
+            "half_width": half_width,
+            "lower": mean - half_width,
+            "upper": mean + half_width,
+        }
+    )
+
+
+def replicate(
+    params,
+    sim_time,
+    target_half_width=None,
+    confidence=0.95,
+    min_replications=10,
+    max_replications=1000,
+    batch=None,
+    number_processes=None,
+    seed=0,
+):
+    """Run seeded replications of MMcQueue until the intervals are narrow enough.
+
+    Args:
+        params: Dictionary of MMcScenario parameters.
+        sim_time: Simulated time of every replication.
+        target_half_width: Stop once the confidence interval of every metric
+            has at most this half-width. None runs max_replications.
+        confidence: Confidence level of the intervals.
+        min_replications: Number of replications to run before checking.
+        max_replications: Maximum number of replications.
+        batch: Number of replications added between checks of the target,
+            None uses min_replications.
+        number_processes: Number of worker processes, None uses all CPUs.
+        seed: Base seed, every replication gets its own seed derived from it.
+
+    Returns:
+        DataFrame with one row per replication, in order of replication.
+    """
+    # the target is checked after fixed batches of replications, whatever the
+    # number of processes, so the results only depend on the seed
+    batch = batch or min_replications
+    rows = []
+    with ProcessPoolExecutor(max_workers=number_processes) as pool:
+        while len(rows) < max_replications:
+            n = max(batch, min_replications - len(rows))
+            n = min(n, max_replications - len(rows))
+            seeds = [replication_seed(seed, i) for i in range(len(rows), len(rows) + n)]
+            rows.extend(pool.map(run_replication, [params] * n, seeds, [sim_time] * n))
+
+            if target_half_width is not None and len(rows) >= min_replications:
+                summary = summarize(pd.DataFrame(rows), confidence)
+                if (summary["half_width"] <= target_half_width).all():
+                    break
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    try:
+        from .analytical_mmc import analytical_mmc
+    except ImportError:
+        from analytical_mmc import analytical_mmc
+
+    ARRIVAL_RATE = 2.0
+    SERVICE_RATE = 1.0
+    N_SERVERS = 3
+    SIM_TIME = 10_000.0
+    TARGET_HALF_WIDTH = 0.01
+
+    params = {
+        "arrival_rate": ARRIVAL_RATE,
+        "service_rate": SERVICE_RATE,
+        "n_servers": N_SERVERS,
+    }
+    results = replicate(params, SIM_TIME, target_half_width=TARGET_HALF_WIDTH)
+    summary = summarize(results)
+    analytical = analytical_mmc(ARRIVAL_RATE, SERVICE_RATE, N_SERVERS)
+    summary["analytical"] = [
+        analytical["avg_wait_time"],
+        analytical["avg_system_time"],
+        analytical["utilization"],
+    ]
+
+    print(f"M/M/{N_SERVERS} Queue (λ={ARRIVAL_RATE}, μ={SERVICE_RATE}, T={SIM_TIME})")
+    print(f"Replications: {len(results)}, 95% confidence intervals\n")
+    print(summary.to_string(float_format="{:.4f}".format))
@@ -0,0 +1,159 @@
+import numpy as np
+import pytest
+from analytical_mmc import analytical_jackson, analytical_mmc
+from distributions import (
+    Deterministic,
+    Distribution,
+    Empirical,
+    Erlang,
+    Exponential,
+    Lognormal,
+    Uniform,
+    VariateStream,
+)
+from estimators import TimeWeighted, Welford
+from model import MMcQueue, MMcScenario
+from network import JacksonNetwork, JacksonScenario
+from replications import replicate
+
+PARAMS = {"arrival_rate": 2.0, "service_rate": 1.0, "n_servers": 3}
+NETWORK = {
+    "arrival_rates": (1.0, 0.5),
+    "service_rates": (2.5, 1.0),
+    "n_servers": (1, 2),
+    "routing": ((0.0, 0.5), (0.3, 0.0)),
+}
+STATISTICS = (
+    "customers_served",
+    "avg_wait_time",
+    "avg_system_time",
+    "server_utilization",
+    "avg_queue_length",
+)
+
+DISTRIBUTIONS = [
+    Exponential(2.0),
+    Erlang(3, 2.0),
+    Lognormal(0.5, 1.5),
+    Deterministic(0.7),
+    Empirical([0.1, 0.5, 2.0]),
+    Uniform(1.0, 3.0),
+]
+
+
+def test_replications_independent_of_processes():
+    # Testing that the stopping rule does not depend on the number of workers
+    results = [
+        replicate(
+            PARAMS,
+            100.0,
+            target_half_width=0.25,
+            min_replications=4,
+            number_processes=processes,
+        )
+        for processes in (2, 3)
+    ]
+    assert 4 < len(results[0]) < 1000
+    assert results[0].equals(results[1])
+
+
+def test_record_mode():
+    # Testing that customers as arrival times give the same run as agents
+    statistics = []
+    for record_mode in (False, True):
+        scenario = MMcScenario(
+            **PARAMS, record_mode=record_mode, warmup_time=50.0, rng=5
+        )
+        model = MMcQueue(scenario=scenario)
+        model.run_until(1000.0)
+        statistics.append([getattr(model, name) for name in STATISTICS])
+    assert statistics[0] == statistics[1]
+
+
+def test_record_mode_analytical():
+    # Testing that a long run in record mode agrees with the Erlang C formulas
+    scenario = MMcScenario(**PARAMS, record_mode=True, warmup_time=100.0, rng=42)
+    model = MMcQueue(scenario=scenario)
+    model.run_until(50_000.0)
+    analytical = analytical_mmc(*PARAMS.values())
+    assert model.server_utilization == pytest.approx(
+        analytical["utilization"], abs=0.01
+    )
+    assert model.avg_wait_time == pytest.approx(analytical["avg_wait_time"], rel=0.1)
+    assert model.avg_queue_length == pytest.approx(
+        analytical["avg_queue_length"], rel=0.1
+    )
+
+
+def test_estimators():
+    # Testing the streaming estimators against NumPy and a hand computation
+    values = np.random.default_rng(0).exponential(2.0, 1000)
+    welford = Welford()
+    for value in values:
+        welford.add(value)
+    assert welford.count == len(values)
+    assert welford.mean == pytest.approx(np.mean(values))
+    assert welford.variance == pytest.approx(np.var(values, ddof=1))
+
+    # 0 until time 1, 2 until time 3, then 1: (0 * 1 + 2 * 2 + 1 * 2) / 5
+    queue = TimeWeighted()
+    queue.update(1.0, 2)
+    queue.update(3.0, 1)
+    assert queue.mean(5.0) == pytest.approx(1.2)
+    # after a reset only the time from then on counts: (1 * 1 + 3 * 1) / 2
+    queue.reset(4.0)
+    queue.update(5.0, 3)
+    assert queue.mean(6.0) == pytest.approx(2.0)
+
+
+def test_distribution_is_abstract():
+    # Testing that a distribution without sample cannot be created
+    with pytest.raises(TypeError):
+        Distribution()
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS, ids=lambda d: type(d).__name__)
+def test_variate_stream(distribution):
+    # Testing that blocks give the same variates as drawing them one at a time,
+    # also after the first block
+    stream = VariateStream(distribution, np.random.default_rng(3))
+    rng = np.random.default_rng(3)
+    for _ in range(stream.block_size + 100):
+        assert stream() == distribution.sample(rng, 1)[0]
+
+
+@pytest.mark.parametrize("distribution", DISTRIBUTIONS, ids=lambda d: type(d).__name__)
+def test_distribution_mean(distribution):
+    # Testing that the samples have the mean of the distribution
+    samples = distribution.sample(np.random.default_rng(0), 100_000)
+    assert np.mean(samples) == pytest.approx(distribution.mean, rel=0.02)
+
+
+def test_jackson_network():
+    # Testing that every station of a network with feedback behaves as
+    # Jackson's theorem predicts
+    model = JacksonNetwork(
+        scenario=JacksonScenario(**NETWORK, warmup_time=500.0, rng=42)
+    )
+    model.run_until(50_000.0)
+    analytical = analytical_jackson(*NETWORK.values())
+    assert model.utilization == pytest.approx(analytical["utilization"], abs=0.02)
+    assert model.avg_number == pytest.approx(analytical["avg_number"], rel=0.05)
+
+
+def test_jackson_unstable():
+    # Testing that routing customers never leave, or that is no probability,
+    # is rejected
+    network = NETWORK | {"routing": ((0.0, 1.0), (1.0, 0.0))}
+    assert analytical_jackson(*network.values()) is None
+    network = NETWORK | {"routing": ((0.0, 1.2), (0.0, 0.0))}
+    with pytest.raises(ValueError):
+        analytical_jackson(*network.values())
+
+
+def test_jackson_without_arrivals():
+    # Testing that an open network needs customers from outside
+    with pytest.raises(ValueError):
+        JacksonNetwork(
+            scenario=JacksonScenario(**NETWORK | {"arrival_rates": (0.0, 0.0)})
+        )
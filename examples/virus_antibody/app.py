@@ -98,6 +98,8 @@ model_params = {
         max=0.3,
         step=0.01,
     ),
+    # keep the interactive visualization responsive, the model itself has no limit
+    "max_population": 200,
 }
 
 
@@ -0,0 +1,47 @@
+"""Step time of the Virus/Antibody model for growing populations.
+
+The space grows with the population so the density of agents, and with it
+the number of neighbours an antibody sees, stays the same as in the default
+model (40 agents on 100 x 100).
+
+Run with:
+    python benchmark.py
+"""
+
+import time
+
+from virus_antibody.model import VirusAntibodyModel
+
+POPULATIONS = [100, 1_000, 10_000, 100_000]
+DENSITY = 40 / (100 * 100)
+N_STEPS = 5
+
+
+def time_steps(population, n_steps=N_STEPS, rng=42):
+    """Return the mean wall clock time of a step for a total population."""
+    side = (population / DENSITY) ** 0.5
+    model = VirusAntibodyModel(
+        rng=rng,
+        initial_antibody=population // 2,
+        initial_viruses=population // 2,
+        width=side,
+        height=side,
+    )
+    start = time.perf_counter()
+    for _ in range(n_steps):
+        model.step()
+    return (time.perf_counter() - start) / n_steps
+
+
+def main():
+    print(f"{'Population':>12} {'Step time (s)':>15} {'Per agent (us)':>15}")
+    print("-" * 44)
+    for population in POPULATIONS:
+        step_time = time_steps(population)
+        print(
+            f"{population:>12} {step_time:>15.4f} {step_time / population * 1e6:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,50 @@
 Mesa implementation of Virus/Antibody model: Agents module.
 """
 
-import copy
 import weakref
 from collections import deque
 
 import numpy as np
 from mesa.experimental.continuous_space import ContinuousSpaceAgent
 
+# Number of digits in the DNA of a virus
+DNA_LENGTH = 3
+
 
 class CellularAgent(ContinuousSpaceAgent):
-    def _random_move(self, speed=1):
-        """Random walk in a 2D space."""
-        perturb = np.array(
-            [
-                self.random.uniform(-0.5, 0.5),
-                self.random.uniform(-0.5, 0.5),
-            ]
-        )
-        self.direction = self.direction + perturb
-        norm = np.linalg.norm(self.direction)
-        if norm > 0:
-            self.direction /= norm
-        self.position += self.direction * speed
+    """An agent whose direction and speed live in the model's movement kernel.
+
+    Random walks are not done by the agents themselves: the model moves all
+    agents flagged as `walking` at once at the end of each step.
+    """
+
+    speed = 1
+
+    def __init__(self, model, space):
+        super().__init__(model=model, space=space)
+        self.model.movement.add(self, self.speed)
+
+    @property
+    def direction(self):
+        """Unit direction of the agent."""
+        return self.model.movement.directions[self.space._agent_to_index[self]]
+
+    @direction.setter
+    def direction(self, value):
+        self.model.movement.directions[self.space._agent_to_index[self]] = value
+
+    @property
+    def walking(self):
+        """Whether the agent random walks in the batched movement phase."""
+        return self.model.movement.walking[self.space._agent_to_index[self]]
+
+    @walking.setter
+    def walking(self, value):
+        self.model.movement.walking[self.space._agent_to_index[self]] = value
+
+    def remove(self):
+        self.model.movement.remove(self)
+        super().remove()
 
 
 class AntibodyAgent(CellularAgent):
@@ -53,28 +75,31 @@ class AntibodyAgent(CellularAgent):
         self.duplication_rate = duplication_rate
 
         # Memory
+        # DNA is an int, the long term memory a set so lookups are O(1)
         self.st_memory: deque = deque(maxlen=self.memory_capacity)
-        self.lt_memory: list = []
+        self.lt_memory: set = set()
 
         # Target & KO state
         self.target = None  # will hold a weakref.ref or None
         self.ko_steps_left = 0
 
     def step(self):
-        nearby_agents, _ = self.space.get_agents_in_radius(
-            self.position, self.sight_range
-        )
-        nearby_viruses = [a for a in nearby_agents if isinstance(a, VirusAgent)]
+        neighbors = self.model.neighbors
         nearby_antibodies = [
             a
-            for a in nearby_agents
-            if isinstance(a, AntibodyAgent) and a.unique_id != self.unique_id
+            for a in neighbors.agents_in_radius(
+                self.position, self.sight_range, AntibodyAgent
+            )
+            if a is not self
         ]
 
-        # Acquire a virus target if we don't already have one
-        if self.target is None and nearby_viruses:
-            closest = nearby_viruses[0]
-            self.target = weakref.ref(closest)
+        # Acquire the closest virus in sight if we don't already have a target
+        if self.target is None:
+            closest = neighbors.nearest_agents(
+                self.position, VirusAgent, k=1, radius=self.sight_range
+            )
+            if closest:
+                self.target = weakref.ref(closest[0])
 
         # Communicate and maybe duplicate
         self.communicate(nearby_antibodies)
@@ -86,12 +111,10 @@ class AntibodyAgent(CellularAgent):
 
     def communicate(self, nearby_antibodies) -> bool:
         for other in nearby_antibodies:
-            to_share = [
-                dna for dna in self.st_memory if dna and dna not in other.lt_memory
-            ]
+            to_share = [dna for dna in self.st_memory if dna not in other.lt_memory]
             if to_share:
                 other.st_memory.extend(to_share)
-                other.lt_memory.extend(to_share)
+                other.lt_memory.update(to_share)
         return True
 
     def duplicate(self):
@@ -103,9 +126,8 @@ class AntibodyAgent(CellularAgent):
             direction=self.direction,
         )
         # Copy over memory
-        clone.st_memory = deque(maxlen=self.memory_capacity)
-        clone.st_memory.extend([item for item in self.st_memory if item])
-        clone.lt_memory = [item for item in self.lt_memory if item]
+        clone.st_memory = self.st_memory.copy()
+        clone.lt_memory = self.lt_memory.copy()
         clone.target = None
         clone.ko_steps_left = 0
 
@@ -117,37 +139,30 @@ class AntibodyAgent(CellularAgent):
             else self.target
         )
 
-        new_pos = None
-
         # KO state: target refers back to self
         if target is self:
+            self.walking = False
             self.ko_steps_left -= 1
             if self.ko_steps_left <= 0:
                 self.target = None
 
-        # Random walk if no target
+        # Random walk if no target, done for all walkers at once by the model
         elif target is None:
-            self._random_move()
+            self.walking = True
 
-        # Chase a valid virus target
+        # Chase a valid virus target, also done for all chasers at once by the
+        # model, which calls engage_virus once the target is within reach
         else:
+            self.walking = False
             if getattr(target, "space", None) is not None:
-                vec = np.array(target.position) - np.array(self.position)
-                dist = np.linalg.norm(vec)
-                if dist > self.speed:
-                    self.direction = vec / dist
-                    new_pos = self.position + self.direction * self.speed
-                else:
-                    self.engage_virus(target)
+                self.model.movement.chase(self, target)
             else:
                 self.target = None
 
-        if new_pos is not None:
-            self.position = new_pos
-
     def engage_virus(self, virus) -> str:
-        dna = copy.deepcopy(virus.dna)
-        if dna in self.st_memory or dna in self.lt_memory:
+        dna = virus.dna
+        # everything in the short term memory is also in the long term memory
+        if dna in self.lt_memory:
             virus.remove()
             self.target = None
 
@@ -158,7 +173,7 @@ class AntibodyAgent(CellularAgent):
                 self.remove()
 
             self.st_memory.append(dna)
-            self.lt_memory.append(dna)
+            self.lt_memory.add(dna)
             self.ko_steps_left = self.ko_timeout
             # mark KO state by weak-ref back to self
             self.target = weakref.ref(self)
@@ -187,11 +202,6 @@ class VirusAgent(CellularAgent):
         self.direction = np.array((1, 1), dtype=float)
         self.dna = dna if dna is not None else self.generate_dna()
 
-    def step(self):
-        if self.random.random() < self.duplication_rate:
-            self.duplicate()
-        self._random_move()
-
     def duplicate(self):
         VirusAgent(
             self.model,
@@ -203,12 +213,19 @@ class VirusAgent(CellularAgent):
         )
 
     def generate_dna(self, dna=None):
+        """Return a new random DNA, or a possibly mutated copy of dna.
+
+        DNA is made of DNA_LENGTH digits, encoded as a single int so it is
+        immutable and cheap to hash and compare. A mutation shifts one digit
+        up or down by one (modulo 10).
+        """
         if dna is None:
-            return [self.random.randint(0, 9) for _ in range(3)]
-        idx = self.random.randint(0, 2)
+            return self.random.randrange(10**DNA_LENGTH)
+        place = 10 ** self.random.randint(0, DNA_LENGTH - 1)
+        digit = dna // place % 10
         chance = self.random.random()
         if chance < self.mutation_rate / 2:
-            dna[idx] = (dna[idx] + 1) % 10
+            dna += ((digit + 1) % 10 - digit) * place
         elif chance < self.mutation_rate:
-            dna[idx] = (dna[idx] - 1) % 10
+            dna += ((digit - 1) % 10 - digit) * place
         return dna
@@ -4,12 +4,16 @@ Virus/Antibody Model
 A mesa implementation of the Virus/Antibody model, where antibodies and viruses interact in a continuous space.
 """
 
+from itertools import compress
+
 import numpy as np
 from mesa import Model
 from mesa.datacollection import DataCollector
 from mesa.experimental.continuous_space import ContinuousSpace
 
-from .agents import AntibodyAgent, VirusAgent
+from .agents import DNA_LENGTH, AntibodyAgent, VirusAgent
+from .movement import MovementKernel
+from .neighbors import NeighborIndex
 
 
 class VirusAntibodyModel(Model):
@@ -32,6 +36,7 @@ class VirusAntibodyModel(Model):
         # Virus parameters
         virus_duplication_rate=0.01,
         virus_mutation_rate=0.01,
+        max_population=None,
     ):
         """Create a new Virus/Antibody  model.
 
@@ -44,6 +49,7 @@ class VirusAntibodyModel(Model):
             antibody_duplication_rate: Probability of duplication for antibodies
             virus_duplication_rate: Probability of duplication for viruses
             virus_mutation_rate: Probability of mutation for viruses
+            max_population: Stop once either population exceeds this, None for no limit
 
         Indirect Args (not chosen in the graphic interface for clarity reasons):
             antibody_memory_capacity: Number of virus DNA an antibody can remember
@@ -66,6 +72,8 @@ class VirusAntibodyModel(Model):
         self.virus_duplication_rate = virus_duplication_rate
         self.virus_mutation_rate = virus_mutation_rate
 
+        self.max_population = max_population
+
         # Statistics
         self.antibodies_killed = 0
         self.virus_killed = 0
@@ -87,6 +95,12 @@ class VirusAntibodyModel(Model):
             # n_agents=initial_antibody + initial_viruses,
         )
 
+        # Directions and speeds of all agents, for the batched movement phase
+        self.movement = MovementKernel(self.space, self.rng)
+
+        # Per type neighbour search, rebuilt at the start of every step
+        self.neighbors = NeighborIndex(self.space)
+
         # Create and place the Antibody agents
         antibodies_positions = self.rng.random(
             size=(self.initial_antibody, 2)
@@ -102,7 +116,7 @@ class VirusAntibodyModel(Model):
         )
 
         # Create and place the Virus agents
-        dna = [self.random.randint(0, 9) for _ in range(3)]
+        dna = self.random.randrange(10**DNA_LENGTH)
         viruses_positions = self.rng.random(size=(self.initial_viruses, 2)) * np.array(
             self.space.size
         )
@@ -121,13 +135,36 @@ class VirusAntibodyModel(Model):
         self.datacollector.collect(self)
 
     def step(self):
-        """Run one step of the model."""
-        self.agents.shuffle_do("step")
+        """Run one step of the model.
+
+        Viruses only need individual attention when they duplicate, which is
+        drawn for all of them at once. The neighbour index is rebuilt, and
+        antibodies use it to look around before they communicate and
+        pick the closest virus as their target. Finally all chasing and random
+        walking agents move in one batch, and only antibodies that reached
+        their target engage it individually.
+        """
+        viruses = list(self.agents_by_type[VirusAgent])
+        duplicating = self.rng.random(len(viruses)) < self.virus_duplication_rate
+        for virus in compress(viruses, duplicating):
+            virus.duplicate()
+
+        self.neighbors.rebuild(
+            {
+                agent_type: self.agents_by_type[agent_type]
+                for agent_type in (AntibodyAgent, VirusAgent)
+            }
+        )
+        self.agents_by_type[AntibodyAgent].shuffle_do("step")
+        for antibody, virus in self.movement.step():
+            # the virus may have been destroyed by another antibody just now
+            if virus.space is not None:
+                antibody.engage_virus(virus)
         self.datacollector.collect(self)
 
-        if (
-            len(self.agents_by_type[AntibodyAgent]) > 200
-            or len(self.agents_by_type[VirusAgent]) > 200
+        if self.max_population is not None and (
+            len(self.agents_by_type[AntibodyAgent]) > self.max_population
+            or len(self.agents_by_type[VirusAgent]) > self.max_population
         ):
             print("Too many agents, stopping the simulation")
             self.running = False
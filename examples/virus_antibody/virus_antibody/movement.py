@@ -0,0 +1,130 @@
+"""
+Mesa implementation of Virus/Antibody model: batched movement.
+"""
+
+import numpy as np
+
+
+class MovementKernel:
+    """Directions and speeds of all agents in a ContinuousSpace.
+
+    The rows of the kernel are aligned with the rows of `space.agent_positions`,
+    so the random walk of every walking agent, and the pursuit of every agent
+    chasing a target, is done with a handful of array operations per step
+    instead of a few small numpy calls per agent.
+    """
+
+    def __init__(self, space, rng, capacity=100):
+        self.space = space
+        self.rng = rng
+        self.n = 0
+        self._directions = np.zeros((capacity, space.ndims))
+        self._speeds = np.zeros(capacity)
+        self._walking = np.zeros(capacity, dtype=bool)
+        # (agent, target) pairs to move towards each other in the next step
+        self.chases = []
+
+    @property
+    def directions(self):
+        """(N, ndims) view of the unit direction of every agent."""
+        return self._directions[: self.n]
+
+    @property
+    def speeds(self):
+        """(N,) view of the speed of every agent."""
+        return self._speeds[: self.n]
+
+    @property
+    def walking(self):
+        """(N,) view of whether an agent random walks in the next step."""
+        return self._walking[: self.n]
+
+    def add(self, agent, speed):
+        """Add a row for an agent that was just added to the space."""
+        if self.n == self._speeds.shape[0]:
+            # we are out of space, double the capacity
+            self._directions = np.vstack(
+                [self._directions, np.zeros_like(self._directions)]
+            )
+            self._speeds = np.concatenate([self._speeds, np.zeros_like(self._speeds)])
+            self._walking = np.concatenate(
+                [self._walking, np.zeros_like(self._walking)]
+            )
+        index = self.space._agent_to_index[agent]
+        self.n += 1
+        self._directions[index] = 0
+        self._speeds[index] = speed
+        self._walking[index] = True
+
+    def remove(self, agent):
+        """Remove the row of an agent that is about to be removed from the space."""
+        index = self.space._agent_to_index[agent]
+        # mirror ContinuousSpace, which moves all rows below the agent one row up
+        for array in (self._directions, self._speeds, self._walking):
+            array[index : self.n - 1] = array[index + 1 : self.n]
+        self.n -= 1
+
+    def chase(self, agent, target):
+        """Let agent move straight towards target in the next step."""
+        self.chases.append((agent, target))
+
+    def _chase_step(self):
+        """Move all chasers towards their target, return those within reach."""
+        chases, self.chases = self.chases, []
+        if not chases:
+            return []
+        index = self.space._agent_to_index
+        rows = np.array([index[agent] for agent, _ in chases])
+        target_rows = np.array([index[target] for _, target in chases])
+
+        positions = self.space.agent_positions
+        delta = positions[target_rows] - positions[rows]
+        if self.space.torus:
+            # chase the target the short way around
+            delta -= np.round(delta / self.space.size) * self.space.size
+        distance = np.linalg.norm(delta, axis=1)
+
+        far = distance > self.speeds[rows]
+        directions = delta[far] / distance[far, np.newaxis]
+        self.directions[rows[far]] = directions
+        self._set_positions(
+            rows[far],
+            positions[rows[far]] + directions * self.speeds[rows[far], np.newaxis],
+        )
+        return [chases[i] for i in np.flatnonzero(~far)]
+
+    def _set_positions(self, rows, positions):
+        if self.space.torus:
+            positions = self.space.torus_correct(positions)
+        else:
+            positions = np.clip(
+                positions, self.space.dimensions[:, 0], self.space.dimensions[:, 1]
+            )
+        self.space.agent_positions[rows] = positions
+
+    def step(self):
+        """Move all chasing and walking agents.
+
+        Chasers move straight towards their target, walkers one step along a
+        randomly perturbed direction.
+
+        Returns:
+            The (agent, target) pairs of chasers that are within reach of
+            their target, and did not move.
+        """
+        within_reach = self._chase_step()
+
+        walkers = np.flatnonzero(self.walking)
+        directions = self.directions[walkers] + self.rng.uniform(
+            -0.5, 0.5, size=(walkers.size, self.space.ndims)
+        )
+        norm = np.linalg.norm(directions, axis=1, keepdims=True)
+        np.divide(directions, norm, out=directions, where=norm > 0)
+        self.directions[walkers] = directions
+
+        self._set_positions(
+            walkers,
+            self.space.agent_positions[walkers]
+            + directions * self.speeds[walkers, np.newaxis],
+        )
+        return within_reach
@@ -0,0 +1,81 @@
+"""
+Mesa implementation of Virus/Antibody model: neighbour search.
+"""
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+class NeighborIndex:
+    """A KD-tree per agent type over the positions in a ContinuousSpace.
+
+    The trees are rebuilt once at the start of each step, after which every
+    radius query only touches the agents close to the query point instead of
+    computing the distance to every agent in the space. On a torus the trees
+    use periodic boundaries, so distances match those of the space.
+
+    Agents removed after the last rebuild are left out of query results,
+    agents added after it are not found until the next rebuild.
+    """
+
+    def __init__(self, space):
+        self.space = space
+        self.origin = space.dimensions[:, 0]
+        self.boxsize = space.size if space.torus else None
+        self.trees = {}
+        self.agents = {}
+
+    def _to_tree_coordinates(self, positions):
+        positions = np.asarray(positions, dtype=float) - self.origin
+        if self.boxsize is not None:
+            # the periodic tree needs all coordinates in [0, size)
+            positions = np.mod(positions, self.boxsize)
+            positions[positions >= self.boxsize] = 0
+        return positions
+
+    def rebuild(self, agents_by_type):
+        """Rebuild the trees from a mapping of agent type to agents."""
+        self.trees = {}
+        self.agents = {}
+        for agent_type, agent_set in agents_by_type.items():
+            agents = list(agent_set)
+            rows = [self.space._agent_to_index[agent] for agent in agents]
+            positions = self._to_tree_coordinates(
+                self.space.agent_positions[rows].reshape(-1, self.space.ndims)
+            )
+            self.agents[agent_type] = agents
+            self.trees[agent_type] = cKDTree(positions, boxsize=self.boxsize)
+
+    def agents_in_radius(self, point, radius, agent_type):
+        """Return the agents of agent_type within radius of point.
+
+        Agents are returned in the order in which they were added to the model.
+        """
+        agents = self.agents.get(agent_type)
+        if not agents:
+            return []
+        indices = self.trees[agent_type].query_ball_point(
+            self._to_tree_coordinates(point), radius, return_sorted=True
+        )
+        return [agents[i] for i in indices if agents[i].space is not None]
+
+    def nearest_agents(self, point, agent_type, k=1, radius=np.inf):
+        """Return up to k agents of agent_type within radius of point, nearest first."""
+        agents = self.agents.get(agent_type)
+        if not agents:
+            return []
+        point = self._to_tree_coordinates(point)
+        upper_bound = np.nextafter(radius, np.inf)
+        # removed agents are still in the tree, so ask for more if we hit them
+        n_query = k
+        while True:
+            n_query = min(n_query, len(agents))
+            _, indices = self.trees[agent_type].query(
+                point, k=list(range(1, n_query + 1)), distance_upper_bound=upper_bound
+            )
+            # missing neighbours (beyond radius) get index len(agents)
+            indices = [i for i in indices.tolist() if i < len(agents)]
+            found = [agents[i] for i in indices if agents[i].space is not None]
+            if len(found) >= k or len(indices) < n_query or n_query == len(agents):
+                return found[:k]
+            n_query *= 2
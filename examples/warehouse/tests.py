@@ -0,0 +1,29 @@
+import numpy as np
+from warehouse.planner import PathPlanner
+
+
+def test_stuck_robot_keeps_reservations():
+    # Testing that a robot that cannot move does not overwrite the
+    # reservation of a robot parked on its cell
+    static = np.zeros((1, 4, 1), dtype=bool)
+    static[0, 3, 0] = True  # inventory at the end of the corridor
+    planner = PathPlanner(None, static, window=4)
+    reservations = planner.reservations
+    stuck, parked = object(), object()
+    start = (0, 0, 0)
+
+    # parked comes down the corridor and parks on start at time 2, so stuck
+    # can neither stay nor get past it
+    reservations.reserve(parked, [(0, 2, 0), (0, 1, 0), start], 0)
+    path = planner.cooperative(stuck, start, (0, 3, 0), 0)
+
+    assert path == [start]
+    assert reservations.parked[start] == (parked, 2)
+    assert reservations.cells[start][2] is parked
+    assert parked in reservations.conflicts
+
+    # once parked plans again, stuck holds its cell
+    reservations.reserve(parked, [(0, 2, 0)], 0)
+    assert parked not in reservations.conflicts
+    assert reservations.parked[start] == (stuck, 0)
+    assert not reservations.is_free(parked, start, 5)
@@ -1,5 +1,3 @@
-from queue import PriorityQueue
-
 import mesa
 from mesa.discrete_space import FixedAgent
 
@@ -13,6 +11,15 @@ class InventoryAgent(FixedAgent):
         self.item = item
         self.quantity = 1000  # Default quantity
 
+    @property
+    def quantity(self) -> int:
+        return self._quantity
+
+    @quantity.setter
+    def quantity(self, quantity: int):
+        self._quantity = quantity
+        self.model.tasks.update(self)
+
 
 class RouteAgent(mesa.Agent):
     """Handles path finding for agents in the warehouse.
@@ -23,50 +30,25 @@ class RouteAgent(mesa.Agent):
     def __init__(self, model):
         super().__init__(model)
 
-    def find_path(self, start, goal) -> list[tuple[int, int, int]] | None:
-        """Determines the path for a robot to take using the A* algorithm."""
-
-        def heuristic(a, b) -> int:
-            dx = abs(a[0] - b[0])
-            dy = abs(a[1] - b[1])
-            return dx + dy
-
-        open_set = PriorityQueue()
-        open_set.put((0, start.coordinate))
-        came_from = {}
-        g_score = {start.coordinate: 0}
-
-        while not open_set.empty():
-            _, current = open_set.get()
-
-            if current[:2] == goal.coordinate[:2]:
-                path = []
-                while current in came_from:
-                    path.append(current)
-                    current = came_from[current]
-                path.reverse()
-                path.insert(0, start.coordinate)
-                path.pop()  # Remove the last location (inventory)
-                return path
-
-            for n_cell in self.model.warehouse[current].neighborhood:
-                coord = n_cell.coordinate
-
-                # Only consider orthogonal neighbors
-                if abs(coord[0] - current[0]) + abs(coord[1] - current[1]) != 1:
-                    continue
-
-                tentative_g_score = g_score[current] + 1
-                if not n_cell.is_empty:
-                    tentative_g_score += 50  # Penalty for non-empty cells
-
-                if coord not in g_score or tentative_g_score < g_score[coord]:
-                    g_score[coord] = tentative_g_score
-                    f_score = tentative_g_score + heuristic(coord, goal.coordinate)
-                    open_set.put((f_score, coord))
-                    came_from[coord] = current
+    def find_path(
+        self, start, goal, delay: int = 0
+    ) -> list[tuple[int, int, int]] | None:
+        """Determines the path for a robot to take around the inventory.
+
+        When robots plan cooperatively, the path also avoids the paths of other
+        robots and the robot leaves start after delay steps.
+        """
+        planner = self.model.planner
+        if planner.reservations is None:
+            return planner.path(start.coordinate, goal.coordinate)
+        departure = planner.reservations.time + delay
+        return planner.cooperative(
+            self.meta_agent, start.coordinate, goal.coordinate, departure
+        )
 
-        return None
+    def find_detour(self, start, goal) -> list[tuple[int, int, int]] | None:
+        """Determines a path around the inventory and other robots using A*."""
+        return self.model.planner.detour(start.coordinate, goal.coordinate)
 
 
 class SensorAgent(mesa.Agent):
@@ -81,19 +63,56 @@ class SensorAgent(mesa.Agent):
     def move(
         self, coord: tuple[int, int, int], path: list[tuple[int, int, int]]
     ) -> str:
-        """Moves the agent along the given path."""
-        if coord not in path:
-            raise ValueError("Current coordinate not in path.")
-
-        idx = path.index(coord)
-        if idx + 1 >= len(path):
-            return "movement complete"
-
-        next_cell = self.model.warehouse[path[idx + 1]]
+        """Moves the agent one step along the given path.
+
+        The path starts with the current coordinate, every step taken is
+        removed from it.
+        """
+        if not path or path[0] != coord:
+            raise ValueError("Current coordinate not at the start of the path.")
+
+        router = self.meta_agent.get_constituting_agent_instance(RouteAgent)
+        destination = self.meta_agent.destination
+        reservations = self.model.planner.reservations
+        if reservations is not None and self.meta_agent in reservations.conflicts:
+            # A robot that could not move is in the way, plan around it
+            self.model.replans += 1
+            self.meta_agent.path = router.find_path(
+                self.meta_agent.cell, destination, delay=1
+            )
+            return "recalculating"
+
+        if len(path) == 1:
+            if self.model.planner.reservations is None or self.model.planner.arrived(
+                coord, destination.coordinate
+            ):
+                return "movement complete"
+            # End of the planning window, plan the next part of the way
+            path = router.find_path(self.meta_agent.cell, destination)
+            self.meta_agent.path = path
+            if len(path) == 1:
+                return "waiting"
+
+        if path[1] == coord:
+            del path[0]
+            return "waiting"
+
+        next_cell = self.model.warehouse[path[1]]
+        if self.model.event_driven:
+            self.model.clear_cell(next_cell)
         if next_cell.is_empty:
             self.meta_agent.cell = next_cell
+            del path[0]
             return "moving"
 
+        self.model.replans += 1
+        if self.model.planner.reservations is not None:
+            # Wait for the way to clear, without leaving the planned paths
+            self.meta_agent.path = router.find_path(
+                self.meta_agent.cell, destination, delay=1
+            )
+            return "recalculating"
+
         # Handle obstacle
         neighbors = self.model.warehouse[self.meta_agent.cell.coordinate].neighborhood
         empty_neighbors = [n for n in neighbors if n.is_empty]
@@ -101,10 +120,7 @@ class SensorAgent(mesa.Agent):
             self.meta_agent.cell = self.random.choice(empty_neighbors)
 
         # Recalculate path
-        new_path = self.meta_agent.get_constituting_agent_instance(
-            RouteAgent
-        ).find_path(self.meta_agent.cell, self.meta_agent.item.cell)
-        self.meta_agent.path = new_path
+        self.meta_agent.path = router.find_detour(self.meta_agent.cell, destination)
         return "recalculating"
 
 
@@ -118,10 +134,15 @@ class WorkerAgent(mesa.Agent):
         self.path: list[tuple[int, int, int]] | None = None
         self.carrying: str | None = None
         self.item: InventoryAgent | None = None
+        self.destination = None
+        # next decision of an event driven robot, and its time
+        self.decision = None
+        self.decision_time = None
 
     def initiate_task(self, item: InventoryAgent):
         """Initiates a task for the robot to perform."""
         self.item = item
+        self.destination = item.cell
         self.path = self.find_path(self.cell, item.cell)
 
     def continue_task(self):
@@ -144,9 +165,44 @@ class WorkerAgent(mesa.Agent):
             self.meta_agent.cell = self.model.warehouse[
                 (loading_coordinate[0], loading_coordinate[1], 0)
             ]
-            self.path = self.find_path(self.cell, self.loading_dock)
+            # The robot has used its move for this step, it leaves next step
+            self.destination = self.loading_dock
+            self.path = self.find_path(self.cell, self.loading_dock, delay=1)
 
         if status == "movement complete" and self.meta_agent.status == "loading":
             # Load item onto truck and return to charging station
             self.carrying = None
             self.meta_agent.status = "open"
+
+    def decide(self):
+        """Takes the next decision of an event driven robot and schedules the
+        one after it, when the robot reaches the end of its reserved path.
+
+        In between the robot follows its path without being visited, it only
+        moves to where the path has it when it is needed.
+        """
+        reservations = self.model.planner.reservations
+        reservations.time = int(self.model.time)
+        self.model.sync_robot(self.meta_agent)
+        if self.path:
+            # drop the steps taken since the last decision, which is usually
+            # all but the last one, unless the robot was woken up early
+            plan, start = reservations.plans[self.meta_agent]
+            taken = min(reservations.time - start, len(plan) - 1)
+            del self.path[: max(0, taken - (len(plan) - len(self.path)))]
+
+        self.model.robot_turn(self.meta_agent)
+        # the first cell of the path is where the robot is at the next step,
+        # an open robot looks for a new task at the next step
+        travelling = self.path and self.meta_agent.status != "open"
+        self.schedule_decision(len(self.path) if travelling else 1)
+        self.model.wake_conflicts()
+
+    def schedule_decision(self, after):
+        """Schedules the next decision of an event driven robot, replacing the
+        one scheduled before.
+        """
+        if self.decision is not None:
+            self.decision.cancel()
+        self.decision_time = self.model.time + after
+        self.decision = self.model.schedule_event(self.decide, after=after)
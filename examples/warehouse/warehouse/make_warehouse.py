@@ -1,51 +1,96 @@
-import random
-import string
-
 import numpy as np
 
 # Constants
 DEFAULT_ROWS = 22
 DEFAULT_COLS = 20
 DEFAULT_HEIGHT = 4
-LOADING_DOCK_COORDS = [(0, i, 0) for i in range(0, 10, 2)]
-CHARGING_STATION_COORDS = [(21, i, 0) for i in range(19, 10, -2)]
+DEFAULT_LOADING_DOCKS = 5
+DEFAULT_CHARGING_STATIONS = 5
 
+# Cell codes of an int layout, every code from ITEM up is an item
+EMPTY = 0
+LOADING_DOCK = 1
+CHARGING_STATION = 2
+ITEM = 110
 
-def generate_item_code() -> str:
-    """Generate a random item code (1 letter + 2 numbers)."""
-    letter = random.choice(string.ascii_uppercase)
-    number = random.randint(10, 99)
-    return f"{letter}{number}"
 
+def item_code(code: int) -> str:
+    """Return the item code (1 letter + 2 numbers) of an int layout code."""
+    return f"{chr(ord('A') + code // 100 - 1)}{code % 100}"
 
-def make_warehouse(
-    rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS, height: int = DEFAULT_HEIGHT
+
+def make_layout(
+    rows: int = DEFAULT_ROWS,
+    cols: int = DEFAULT_COLS,
+    height: int = DEFAULT_HEIGHT,
+    loading_docks: int = DEFAULT_LOADING_DOCKS,
+    charging_stations: int = DEFAULT_CHARGING_STATIONS,
+    rng: np.random.Generator | int | None = None,
 ) -> np.ndarray:
-    """Generate a warehouse layout with designated LD, CS, and storage rows as a NumPy array.
+    """Generate a warehouse layout of any size as an int NumPy array.
+
+    Loading docks are placed on every other cell of the first row, charging
+    stations on every other cell of every other row from the back of the
+    warehouse. The rows in between hold storage racks, on every third row and
+    column and on every level, with 2 free cells in between.
 
     Args:
         rows (int): Number of rows in the warehouse.
         cols (int): Number of columns in the warehouse.
         height (int): Number of levels in the warehouse.
+        loading_docks (int): Number of loading docks.
+        charging_stations (int): Number of charging stations.
+        rng: Random number generator or seed for the item codes.
 
     Returns:
-        np.ndarray: A 3D NumPy array representing the warehouse layout.
+        np.ndarray: A 3D array of cell codes, EMPTY, LOADING_DOCK,
+        CHARGING_STATION or an item code of ITEM or higher.
     """
-    # Initialize empty warehouse layout
-    warehouse = np.full((rows, cols, height), "  ", dtype=object)
+    per_row = (cols + 1) // 2
+    if loading_docks > per_row:
+        raise ValueError(f"At most {per_row} loading docks fit in {cols} columns.")
+    rng = np.random.default_rng(rng)
+    warehouse = np.full((rows, cols, height), EMPTY, dtype=np.int16)
 
     # Place Loading Docks (LD)
-    for r, c, h in LOADING_DOCK_COORDS:
-        warehouse[r, c, h] = "LD"
+    warehouse[0, 0 : 2 * loading_docks : 2, 0] = LOADING_DOCK
 
-    # Place Charging Stations (CS)
-    for r, c, h in CHARGING_STATION_COORDS:
-        warehouse[r, c, h] = "CS"
+    # Place Charging Stations (CS), from the back right corner
+    row = rows - 1
+    for start in range(0, charging_stations, per_row):
+        n = min(per_row, charging_stations - start)
+        warehouse[row, np.arange(cols - 1, -1, -2)[:n], 0] = CHARGING_STATION
+        row -= 2
 
     # Fill storage rows with item codes
-    for r in range(3, rows - 2, 3):  # Skip row 0,1,2 (LD) and row 17,18,19 (CS)
-        for c in range(2, cols, 3):  # Leave 2 spaces between each item row
-            for h in range(height):
-                warehouse[r, c, h] = generate_item_code()
+    storage_rows = np.arange(3, row, 3)  # Skip rows 0,1,2 (LD) and 2 rows before CS
+    storage_cols = np.arange(2, cols, 3)  # Leave 2 spaces between each item row
+    if storage_rows.size == 0:
+        raise ValueError("No room left for storage, the warehouse is too small.")
+    shape = (storage_rows.size, storage_cols.size, height)
+    letters = rng.integers(26, size=shape)
+    numbers = rng.integers(10, 100, size=shape)
+    warehouse[np.ix_(storage_rows, storage_cols)] = 100 * (letters + 1) + numbers
+
+    return warehouse
 
+
+def make_warehouse(
+    rows: int = DEFAULT_ROWS, cols: int = DEFAULT_COLS, height: int = DEFAULT_HEIGHT
+) -> np.ndarray:
+    """Generate a warehouse layout with designated LD, CS, and storage rows as a NumPy array.
+
+    Args:
+        rows (int): Number of rows in the warehouse.
+        cols (int): Number of columns in the warehouse.
+        height (int): Number of levels in the warehouse.
+
+    Returns:
+        np.ndarray: A 3D NumPy array representing the warehouse layout.
+    """
+    layout = make_layout(rows, cols, height)
+    names = {EMPTY: "  ", LOADING_DOCK: "LD", CHARGING_STATION: "CS"}
+    warehouse = np.empty(layout.shape, dtype=object)
+    for index, code in np.ndenumerate(layout):
+        warehouse[index] = names.get(code) or item_code(code)
     return warehouse
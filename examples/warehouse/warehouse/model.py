@@ -1,4 +1,5 @@
 import mesa
+import numpy as np
 from mesa.discrete_space import OrthogonalMooreGrid
 from mesa.discrete_space.cell_agent import CellAgent
 from mesa.experimental.meta_agents.meta_agent import create_meta_agent
@@ -9,18 +10,19 @@ from .agents import (
     SensorAgent,
     WorkerAgent,
 )
-from .make_warehouse import make_warehouse
-
-# Constants for configuration
-LOADING_DOCKS = [(0, 0, 0), (0, 2, 0), (0, 4, 0), (0, 6, 0), (0, 8, 0)]
-CHARGING_STATIONS = [
-    (21, 19, 0),
-    (21, 17, 0),
-    (21, 15, 0),
-    (21, 13, 0),
-    (21, 11, 0),
-]
-INVENTORY_START_ROW_OFFSET = 3
+from .make_warehouse import (
+    CHARGING_STATION,
+    DEFAULT_COLS,
+    DEFAULT_HEIGHT,
+    DEFAULT_LOADING_DOCKS,
+    DEFAULT_ROWS,
+    ITEM,
+    LOADING_DOCK,
+    item_code,
+    make_layout,
+)
+from .planner import PathPlanner
+from .tasks import TaskQueue
 
 
 class WarehouseModel(mesa.Model):
@@ -29,19 +31,47 @@ class WarehouseModel(mesa.Model):
     (e.g., routing, sensors, etc.).
     """
 
-    def __init__(self, rng=42):
+    def __init__(
+        self,
+        rng=42,
+        window=16,
+        rows=DEFAULT_ROWS,
+        cols=DEFAULT_COLS,
+        height=DEFAULT_HEIGHT,
+        loading_docks=DEFAULT_LOADING_DOCKS,
+        robots=5,
+        event_driven=False,
+    ):
         """Initialize the model.
 
         Args:
             rng (int): Random number generator.
+            window (int | None): Number of steps robots plan their paths ahead
+                of each other. None = robots plan on their own and look for a
+                way around when they run into each other.
+            rows (int): Number of rows in the warehouse.
+            cols (int): Number of columns in the warehouse.
+            height (int): Number of levels in the warehouse.
+            loading_docks (int): Number of loading docks, shared by the robots.
+            robots (int): Number of robots, each with its own charging station.
+            event_driven (bool): Whether robots only act when they reach the end
+                of their reserved path, instead of on every step. Needs a window.
         """
         super().__init__(rng=rng)
+        if event_driven and window is None:
+            raise ValueError("An event driven model needs a planning window.")
+        self.event_driven = event_driven
+        self.replans = 0
         self.inventory = {}
-        self.loading_docks = LOADING_DOCKS
-        self.charging_stations = CHARGING_STATIONS
+        self.tasks = TaskQueue()
 
         # Create warehouse and instantiate grid
-        layout = make_warehouse()
+        layout = make_layout(rows, cols, height, loading_docks, robots, self.rng)
+        self.loading_docks = [tuple(c) for c in np.argwhere(layout == LOADING_DOCK)]
+        self.charging_stations = sorted(
+            (tuple(c) for c in np.argwhere(layout == CHARGING_STATION)),
+            key=lambda c: (-c[0], -c[1]),
+        )
         self.warehouse = OrthogonalMooreGrid(
             (layout.shape[0], layout.shape[1], layout.shape[2]),
             torus=False,
@@ -50,23 +80,26 @@ class WarehouseModel(mesa.Model):
         )
 
         # Create Inventory Agents
-        for row in range(
-            INVENTORY_START_ROW_OFFSET, layout.shape[0] - INVENTORY_START_ROW_OFFSET
-        ):
-            for col in range(layout.shape[1]):
-                for height in range(layout.shape[2]):
-                    if layout[row][col][height].strip():
-                        item = layout[row][col][height]
-                        InventoryAgent(self, self.warehouse[row, col, height], item)
+        storage = layout >= ITEM
+        coordinates = np.argwhere(storage).tolist()
+        InventoryAgent.create_agents(
+            self,
+            len(coordinates),
+            [self.warehouse[tuple(c)] for c in coordinates],
+            [item_code(code) for code in layout[storage].tolist()],
+        )
+
+        # Shared path planner, the inventory is the only static obstacle
+        self.planner = PathPlanner(self.warehouse, storage, window)
 
         # Create Robot Agents
-        for idx in range(len(self.loading_docks)):
+        for idx in range(robots):
             # Create constituting_agents
             router = RouteAgent(self)
             sensor = SensorAgent(self)
             worker = WorkerAgent(
                 self,
-                self.warehouse[self.loading_docks[idx]],
+                self.warehouse[self.loading_docks[idx % len(self.loading_docks)]],
                 self.warehouse[self.charging_stations[idx]],
             )
 
@@ -83,6 +116,16 @@ class WarehouseModel(mesa.Model):
                 assume_constituting_agent_attributes=True,
                 assume_constituting_agent_methods=True,
             )
+            if self.planner.reservations is not None:
+                self.planner.reservations.reserve(
+                    self.RobotAgent, [self.RobotAgent.cell.coordinate], 0
+                )
+            if event_driven:
+                self.RobotAgent.schedule_decision(0)
+
+        if event_driven:
+            # Disable default step schedule, robots schedule their own decisions
+            self._default_schedule.stop()
 
     def central_move(self, robot):
         """Consolidates meta-agent behavior in the model class.
@@ -92,16 +135,57 @@ class WarehouseModel(mesa.Model):
         """
         robot.move(robot.cell.coordinate, robot.path)
 
+    def robot_turn(self, robot):
+        """Lets a robot pick a task if it has none, or continue its task.
+
+        Args:
+            robot: The robot meta-agent.
+        """
+        if robot.status == "open":  # Assign a task to the robot
+            item = self.tasks.choice(self.random)
+            if item is not None:
+                robot.initiate_task(item)
+                robot.status = "inventory"
+                self.central_move(robot)
+        else:
+            robot.continue_task()
+
+    def sync_robot(self, robot):
+        """Moves an event driven robot to the cell its reserved path has it in now.
+
+        Args:
+            robot: The robot meta-agent.
+        """
+        coordinate = self.planner.reservations.position(robot, int(self.time))
+        cell = self.warehouse[coordinate]
+        if robot.cell is not cell:
+            robot.cell = None
+            self.clear_cell(cell)
+            robot.cell = cell
+
+    def clear_cell(self, cell):
+        """Moves event driven robots that have not caught up with their path out
+        of cell, their reservations guarantee they are no longer in it.
+
+        Args:
+            cell: The cell to clear.
+        """
+        for robot in list(cell.agents):
+            self.sync_robot(robot)
+
+    def wake_conflicts(self):
+        """Lets event driven robots that are in the way of a robot that could
+        not move decide at the next step, so they plan again before they get
+        to it, rather than at the end of their path.
+        """
+        for robot in self.planner.reservations.conflicts:
+            if robot.decision_time > self.time + 1:
+                robot.schedule_decision(1)
+
     def step(self):
         """Advance the model by one step."""
         for robot in self.agents_by_type[type(self.RobotAgent)]:
-            agent_list = self.agents_by_type[InventoryAgent].to_list()
-
-            if robot.status == "open":  # Assign a task to the robot
-                item = self.random.choice(agent_list)
-                if item.quantity > 0:
-                    robot.initiate_task(item)
-                    robot.status = "inventory"
-                    self.central_move(robot)
-            else:
-                robot.continue_task()
+            self.robot_turn(robot)
+
+        if self.planner.reservations is not None:
+            self.planner.reservations.time += 1
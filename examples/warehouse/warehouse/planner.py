@@ -0,0 +1,355 @@
+"""Path planning service shared by all robots in the warehouse."""
+
+import heapq
+
+import numpy as np
+from scipy.sparse import coo_array
+from scipy.sparse.csgraph import dijkstra
+
+# A robot moves one cell along a row or column, and may change level while
+# doing so. Moves that stay on the same level are tried first.
+MOVES = [
+    (d_row, d_col, d_level)
+    for d_row, d_col in ((-1, 0), (1, 0), (0, -1), (0, 1))
+    for d_level in (0, -1, 1)
+]
+# Extra cost of moving into an occupied cell
+OCCUPIED_PENALTY = 50
+
+
+class ReservationTable:
+    """Cells reserved by robots over time, for cooperative path planning.
+
+    A robot reserves every cell of its planned path for the step it will be
+    in it, and the last cell of the path from then on, until it plans again.
+    Because robots move one after the other within a step, a robot can only
+    be in a cell if no other robot is in it one step before or after.
+
+    Attributes:
+        time (int): The current step, advanced by the model.
+    """
+
+    def __init__(self):
+        self.time = 0
+        # coordinate -> time -> robot
+        self.cells = {}
+        # coordinate -> (robot, time from which the robot stays in the cell)
+        self.parked = {}
+        # robot -> (path, time of the first cell of the path)
+        self.plans = {}
+        # coordinate -> (robot, time) of a robot that could not move, and
+        # parks in the cell once the robot parked there releases it
+        self.waiting = {}
+        # robots whose reservations are in the way of a robot that could not
+        # move, they have to plan again
+        self.conflicts = set()
+
+    def is_free(self, robot, coordinate, time) -> bool:
+        """Return whether robot can be in coordinate at time."""
+        parked = self.parked.get(coordinate)
+        if parked is not None and parked[0] is not robot and parked[1] <= time + 1:
+            return False
+        reserved = self.cells.get(coordinate)
+        if reserved:
+            for t in (time - 1, time, time + 1):
+                other = reserved.get(t)
+                if other is not None and other is not robot:
+                    return False
+        return True
+
+    def can_park(self, robot, coordinate, time) -> bool:
+        """Return whether robot can stay in coordinate from time on."""
+        if not self.is_free(robot, coordinate, time):
+            return False
+        reserved = self.cells.get(coordinate, {})
+        return all(other is robot or t < time - 1 for t, other in reserved.items())
+
+    def reserve(self, robot, path, time):
+        """Reserve path for robot, starting at time, replacing its previous path."""
+        self.release(robot)
+        self.conflicts.discard(robot)
+        for step, coordinate in enumerate(path):
+            self.cells.setdefault(coordinate, {})[time + step] = robot
+        self.parked[path[-1]] = (robot, time + len(path) - 1)
+        # robots consume their path as they move, keep a copy
+        self.plans[robot] = (tuple(path), time)
+
+    def stay(self, robot, coordinate, time):
+        """Reserve coordinate for robot from time on, for a robot that cannot move.
+
+        Unlike `reserve`, the reservations of other robots are left as they
+        are. The robots that have reserved coordinate from time on are added
+        to conflicts, and if one of them is parked there, robot only parks in
+        coordinate once that robot releases it.
+        """
+        self.release(robot)
+        self.conflicts.discard(robot)
+        reserved = self.cells.setdefault(coordinate, {})
+        self.conflicts.update(
+            other
+            for t, other in reserved.items()
+            if other is not robot and t >= time - 1
+        )
+        reserved.setdefault(time, robot)
+        parked = self.parked.get(coordinate)
+        if parked is None:
+            self.parked[coordinate] = (robot, time)
+        else:
+            self.conflicts.add(parked[0])
+            self.waiting[coordinate] = (robot, time)
+        self.plans[robot] = ((coordinate,), time)
+
+    def release(self, robot):
+        """Remove all reservations of robot."""
+        path, time = self.plans.pop(robot, ((), 0))
+        for step, coordinate in enumerate(path):
+            reserved = self.cells.get(coordinate, {})
+            if reserved.get(time + step) is robot:
+                del reserved[time + step]
+            if not reserved:
+                self.cells.pop(coordinate, None)
+        if not path:
+            return
+        last = path[-1]
+        if self.waiting.get(last, (None,))[0] is robot:
+            del self.waiting[last]
+        elif self.parked[last][0] is robot:
+            del self.parked[last]
+            if last in self.waiting:
+                self.parked[last] = self.waiting.pop(last)
+
+    def position(self, robot, time) -> tuple[int, int, int]:
+        """Return the coordinate robot has reserved at time."""
+        path, start = self.plans[robot]
+        return path[min(max(time - start, 0), len(path) - 1)]
+
+
+class PathPlanner:
+    """Shortest paths over the warehouse floor.
+
+    The inventory never moves, so the cost of reaching a goal column while
+    only avoiding inventory is fixed. For every goal that cost is computed once
+    for all cells, as a reverse distance field, and a path to the goal is found
+    by walking down that field. Fields are computed the first time a goal is
+    asked for and cached from then on.
+
+    Detours around robots depend on where the robots are right now, those are
+    planned with A* instead.
+
+    With a window, robots plan cooperatively instead: every path is planned
+    in space and time against the paths other robots have reserved, up to
+    window steps ahead, using the distance fields as heuristic (windowed
+    hierarchical cooperative A*). Robots then wait for each other rather
+    than run into each other. They also stay on the floor, so the levels
+    above are free for lifting items, and the fields only cover the floor.
+
+    Args:
+        grid: The warehouse grid.
+        static (np.ndarray): Boolean array of the grid's shape, True where
+            a cell is permanently occupied.
+        window (int, optional): Number of steps robots plan ahead of each
+            other. None = every robot plans on its own.
+        max_fields (int): Number of distance fields kept in memory, the
+            least recently used field is dropped first.
+    """
+
+    def __init__(self, grid, static, window=None, max_fields=1024):
+        self.grid = grid
+        self.window = window
+        self.reservations = None if window is None else ReservationTable()
+        self.shape = static.shape
+        self.static = static
+        self.max_fields = max_fields
+        # goal column -> distance field, in order of last use
+        self.fields = {}
+
+        # graph of all moves, weighted by the cost of entering the target cell,
+        # transposed so searching it from a goal gives the cost to the goal
+        self.field_shape = self.shape if window is None else (*self.shape[:2], 1)
+        index = np.arange(np.prod(self.field_shape)).reshape(self.field_shape)
+        cost = 1 + OCCUPIED_PENALTY * static[..., : self.field_shape[2]]
+        sources, targets, weights = [], [], []
+        for move in MOVES:
+            source = tuple(
+                slice(max(0, -d), n - max(0, d)) for d, n in zip(move, self.field_shape)
+            )
+            target = tuple(
+                slice(max(0, d), n - max(0, -d)) for d, n in zip(move, self.field_shape)
+            )
+            sources.append(index[source].ravel())
+            targets.append(index[target].ravel())
+            weights.append(cost[target].ravel())
+        self._reverse_graph = coo_array(
+            (
+                np.concatenate(weights).astype(float),
+                (np.concatenate(targets), np.concatenate(sources)),
+            ),
+            shape=(index.size, index.size),
+        ).tocsr()
+        # dijkstra wants 32 bit indices, convert them once rather than per call
+        self._reverse_graph.indices = self._reverse_graph.indices.astype(np.int32)
+        self._reverse_graph.indptr = self._reverse_graph.indptr.astype(np.int32)
+
+    def moves(self, coordinate):
+        """Return the coordinates a robot can move to from coordinate."""
+        row, col, level = coordinate
+        rows, cols, levels = self.shape
+        return [
+            (row + d_row, col + d_col, level + d_level)
+            for d_row, d_col, d_level in MOVES
+            if 0 <= row + d_row < rows
+            and 0 <= col + d_col < cols
+            and 0 <= level + d_level < levels
+        ]
+
+    def distance_field(self, goal):
+        """Return the cost of reaching the column of goal from every cell."""
+        key = goal[:2]
+        field = self.fields.pop(key, None)
+        if field is None:
+            levels = self.field_shape[2]
+            goal_cells = np.ravel_multi_index(
+                (np.full(levels, key[0]), np.full(levels, key[1]), np.arange(levels)),
+                self.field_shape,
+            )
+            distance = dijkstra(self._reverse_graph, indices=goal_cells, min_only=True)
+            field = distance.astype(np.float32).reshape(self.field_shape)
+            if len(self.fields) >= self.max_fields:
+                del self.fields[next(iter(self.fields))]
+        self.fields[key] = field
+        return field
+
+    def _cost(self, coordinate):
+        return 1 + OCCUPIED_PENALTY * self.static[coordinate]
+
+    def path(self, start, goal) -> list[tuple[int, int, int]] | None:
+        """Return the cheapest path from start to the column of goal.
+
+        Only the inventory is avoided. Like `detour`, the path starts with
+        start and leaves out the goal cell itself.
+        """
+        field = self.distance_field(goal)
+        if np.isinf(field[start]):
+            return None
+
+        path = [start]
+        current = start
+        while current[:2] != goal[:2]:
+            current = min(
+                self.moves(current),
+                key=lambda coord: self._cost(coord) + field[coord],
+            )
+            path.append(current)
+        path.pop()  # Remove the last location (inventory)
+        return path
+
+    def detour(self, start, goal) -> list[tuple[int, int, int]] | None:
+        """Return the cheapest path from start to the column of goal using A*.
+
+        Unlike `path`, every occupied cell is avoided, including those with
+        a robot in it.
+        """
+
+        def heuristic(a, b) -> int:
+            dx = abs(a[0] - b[0])
+            dy = abs(a[1] - b[1])
+            return dx + dy
+
+        open_set = [(0, start)]
+        came_from = {}
+        g_score = {start: 0}
+
+        while open_set:
+            _, current = heapq.heappop(open_set)
+
+            if current[:2] == goal[:2]:
+                path = []
+                while current in came_from:
+                    path.append(current)
+                    current = came_from[current]
+                path.reverse()
+                path.insert(0, start)
+                path.pop()  # Remove the last location (inventory)
+                return path
+
+            for coord in self.moves(current):
+                tentative_g_score = g_score[current] + 1
+                if not self.grid[coord].is_empty:
+                    tentative_g_score += OCCUPIED_PENALTY
+
+                if coord not in g_score or tentative_g_score < g_score[coord]:
+                    g_score[coord] = tentative_g_score
+                    f_score = tentative_g_score + heuristic(coord, goal)
+                    heapq.heappush(open_set, (f_score, coord))
+                    came_from[coord] = current
+
+        return None
+
+    def arrived(self, coordinate, goal) -> bool:
+        """Return whether a robot in coordinate has arrived at goal.
+
+        Robots that plan cooperatively stop on the floor next to the goal
+        column.
+        """
+        return (
+            coordinate[2] == 0
+            and abs(coordinate[0] - goal[0]) + abs(coordinate[1] - goal[1]) == 1
+        )
+
+    def cooperative(self, robot, start, goal, departure) -> list[tuple[int, int, int]]:
+        """Return a path for robot from start to goal, and reserve it.
+
+        The path starts with start, at time departure, and holds the cell
+        the robot is in for each following step, so it may contain the same
+        cell several times if the robot has to wait. It ends next to goal, or
+        after the window if goal is further away. If no path can be found
+        the robot stays where it is, and robots that have reserved its cell
+        have to plan again, see `ReservationTable.stay`.
+        """
+        reservations = self.reservations
+        field = self.distance_field(goal)
+        # cost of entering the goal column, which the path leaves out
+        entry = 1 + OCCUPIED_PENALTY * self.static[goal[0], goal[1]].all()
+
+        def heuristic(coord):
+            return field[coord] - entry
+
+        h = heuristic(start)
+        open_set = [(h, h, 0, start)]
+        came_from = {(start, 0): None}
+        found = None
+
+        while open_set:
+            _, _, g, current = heapq.heappop(open_set)
+
+            if (
+                self.arrived(current, goal) or g >= self.window
+            ) and reservations.can_park(robot, current, departure + g):
+                found = (current, g)
+                break
+            if g >= 4 * self.window:
+                continue
+
+            for coord in [current, *self.moves(current)]:
+                state = (coord, g + 1)
+                if (
+                    state in came_from
+                    or coord[2] > 0
+                    or self.static[coord]
+                    or not reservations.is_free(robot, coord, departure + g + 1)
+                ):
+                    continue
+                came_from[state] = (current, g)
+                h = heuristic(coord)
+                heapq.heappush(open_set, (g + 1 + h, h, g + 1, coord))
+
+        path = []
+        while found is not None:
+            path.append(found[0])
+            found = came_from[found]
+        path.reverse()
+        if not path:
+            reservations.stay(robot, start, departure)
+            return [start]
+        reservations.reserve(robot, path, departure)
+        return path
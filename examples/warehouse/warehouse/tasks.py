@@ -0,0 +1,37 @@
+"""Task assignment for the robots in the warehouse."""
+
+
+class TaskQueue:
+    """Inventory items that are in stock, to hand out as tasks to robots.
+
+    Items keep themselves in sync through their `quantity` setter, so picking
+    a task never scans the inventory.
+    """
+
+    def __init__(self):
+        self.items = []
+        # item -> position in self.items
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def update(self, item):
+        """Add item if it is in stock, or remove it if it is not."""
+        if item.quantity > 0:
+            if item not in self.index:
+                self.index[item] = len(self.items)
+                self.items.append(item)
+        elif item in self.index:
+            # move the last item into the gap to keep removal O(1)
+            position = self.index.pop(item)
+            last = self.items.pop()
+            if last is not item:
+                self.items[position] = last
+                self.index[last] = position
+
+    def choice(self, random):
+        """Return a random item that is in stock, or None."""
+        if not self.items:
+            return None
+        return random.choice(self.items)